@@ -15,6 +15,19 @@ class FootballTeamIterator:
             return val
         else:
             raise StopIteration()
+
+    def state(self):
+        # the position can be saved and given to restore() later
+        return self.index
+
+    def restore(self, state):
+        self.index = state
+
+    def next_batch(self, n):
+        # up to n members, an empty list at the end
+        batch = self.members[self.index:self.index + n]
+        self.index += len(batch)
+        return batch
          
 
 class FootballTeam:  
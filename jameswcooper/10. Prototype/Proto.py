@@ -2,9 +2,14 @@ import tkinter as tk
 from tkinter import *
 from tkinter import messagebox
 from tkinter import ttk
-from Lib import copy
+from operator import attrgetter
 import os, sys
 
+# the cached file loader is shared by all the swim examples
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, "SwimCommon"))
+from FileCache import fileCache
+
 # derived class from Button that contains empty comd function
 class DButton(Button):
     def __init__(self, master, **kwargs):
@@ -71,6 +76,49 @@ class Swimmer():
         return self.frname + " " + self.lname  # combine names
 
 
+# the swimmers of one file, in file order
+# the file cache adds the lines as they are read
+class SwimmerList(list):
+    def addLines(self, lines):
+        for swstring in lines:
+            if swstring.strip():
+                self.append(Swimmer(swstring))
+
+
+# A clone of a list of swimmers that shares the original
+# list until it is changed, so cloning costs nothing.
+# The first change copies the list (copy on write), and
+# replacing the whole contents never copies at all
+class CloneView():
+    def __init__(self, swmrs):
+        self.base = swmrs   # shared, never changed through this view
+        self.own = None     # private list once the view is changed
+
+    def items(self):
+        return self.base if self.own is None else self.own
+
+    def __len__(self):
+        return len(self.items())
+
+    def __getitem__(self, index):
+        return self.items()[index]
+
+    def __iter__(self):
+        return iter(self.items())
+
+    def __setitem__(self, index, value):
+        if self.own is None and index == slice(None):
+            self.own = list(value)      # new contents, nothing to copy
+        else:
+            self.materialize()[index] = value
+
+    # copies the shared list the first time the view is changed
+    def materialize(self):
+        if self.own is None:
+            self.own = list(self.base)
+        return self.own
+
+
 class BuildUI():
     def __init__(self,root):
         self.root = root
@@ -99,15 +147,10 @@ class BuildUI():
 
         mainloop()
     def readFile(self):
-        self.swimmers = []  # array of swimmers
         # read in the data file for this event
+        # it is only parsed again if it has changed
         datafile = (os.path.join(sys.path[0], 'Swimmers.txt'))
-        f = open(datafile, "r")
-        # the Swimmer class parses each line of the data file
-        for swstring in f:
-            sw = Swimmer(swstring)
-            self.swimmers.append(sw)
-        f.close()
+        self.swimmers = fileCache.load(datafile, SwimmerList)
 
     def refreshLeft(self):
         self.readFile()
@@ -130,17 +173,21 @@ class BuildUI():
         self.fillList(self.rightlist, sw)
 
     def clone(self):
-        swmrs=copy.copy(self.swmrs)
+        swmrs = CloneView(self.swmrs)   # shares the list until sorted
         sw= self.sbySex(swmrs)
         self.fillList(self.rightlist, sw)
 
+    # stable counting sort on sex: one pass puts each swimmer
+    # in the bucket for its sex, and the buckets are joined in order
+    # the list (or clone) is changed in place and returned
     def sbySex(self, swmrs):
-        for i in range(0, len(swmrs)):
-            for j in range(i, len(swmrs)):
-                if (swmrs[i].sex > swmrs[j].sex):
-                    swtemp = swmrs[i]
-                    swmrs[i] = swmrs[j]
-                    swmrs[j] = swtemp
+        buckets = {}
+        for sw in swmrs:
+            buckets.setdefault(sw.sex, []).append(sw)
+        ordered = []
+        for sex in sorted(buckets):
+            ordered.extend(buckets[sex])
+        swmrs[:] = ordered
         return swmrs
 
     def restoreLeft(self):
@@ -148,19 +195,9 @@ class BuildUI():
         self.fillList(self.leftList, self.swmrs)
 
         # Sorts the swimmers by seed time
+        # into a new list, leaving self.swimmers in file order
     def sortUpwards(self):
-        swmrs = []
-
-        for swmr in self.swimmers:
-            swmrs.append(swmr)
-
-        for i in range(0, len(swmrs)):
-            for j in range(i, len(swmrs)):
-                if (swmrs[i].time > swmrs[j].time):
-                    swtemp = swmrs[i]
-                    swmrs[i] = swmrs[j]
-                    swmrs[j] = swtemp
-        return swmrs
+        return sorted(self.swimmers, key=attrgetter("time"))
 
 
 # main begins here
@@ -1,26 +1,548 @@
 #import MySQLdb
+from collections import OrderedDict
+from contextlib import contextmanager
+import csv
+from itertools import islice
+import re
 import sqlite3
+import sys
+import threading
+import time
+import weakref
 
 """DBObjects contains only 4 objects: Database, Query, Table and Results
 The Query class supports replacement of arguments if the string ?0, ?1
-and so forth are in the query. So replaces Apple with Oranges is very simple"""
+and so forth are in the query. So replaces Apple with Oranges is very simple
+The arguments are bound as driver parameters, not pasted into the SQL,
+so the statement text stays the same and the driver can reuse it"""
 
 class Database():
+    resultCache = None      # set by enableCache
+
+    # with a cache, the results made stale by this thread's
+    # writes are dropped again once other connections see them
     def commit(self):
         self._db.commit()
+        if self.resultCache is not None:
+            self.resultCache.transactionEnded()
+
+    def rollback(self):
+        self._db.rollback()
+        if self.resultCache is not None:
+            self.resultCache.transactionEnded()
+
+    # keeps the rows of repeated selects in memory until a
+    # write through the facade changes one of their tables
+    # Writes through Query, VariableQuery, Table and the cursor
+    # property are seen; writes made on a connection or cursor
+    # taken some other way are not, so call clear() after them
+    def enableCache(self, maxBytes=16 * 2**20, maxEntries=1024):
+        self.resultCache = ResultCache(maxBytes, maxEntries)
+        return self.resultCache
 
     def create(self, dbname):
         pass
     def getName(self):
         return self._dbname
 
+    # with a cache the cursor drops the results its writes change
     @property
     def cursor(self):
+        if self.resultCache is not None:
+            return CachingCursor(self._cursor, self.resultCache)
         return self._cursor
 
     def getTables(self):
         pass
 
+# A cursor whose write statements drop the cached results
+# of the tables they change; anything else is the cursor's own
+class CachingCursor():
+    def __init__(self, cursor, cache):
+        self.cursor = cursor
+        self.cache = cache
+
+    def execute(self, sql, *params):
+        self.cursor.execute(sql, *params)
+        if self.cache.isWrite(sql):
+            self.cache.wrote(sql)
+        return self
+
+    def executemany(self, sql, rows):
+        self.cursor.executemany(sql, rows)
+        if self.cache.isWrite(sql):
+            self.cache.wrote(sql)
+        return self
+
+    # a script may write anything, so everything is dropped
+    def executescript(self, script):
+        self.cursor.executescript(script)
+        self.cache.clear()
+        return self
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+# Thread safe pool of database connections
+# connect() makes a new connection, check(conn) raises an
+# exception if a connection is no longer usable and
+# inTransaction(conn) is true while it has uncommitted writes
+# A thread leases a connection for each statement it runs, and
+# gives it back once the statement's rows are read, unless it
+# has a transaction open, which keeps it until commit or rollback
+class ConnectionPool():
+    def __init__(self, connect, size=4, timeout=30.0, idleTime=300.0,
+                 check=None, inTransaction=None):
+        self.connect = connect
+        self.size = size            # most connections open at once
+        self.timeout = timeout      # longest wait for a connection
+        self.idleTime = idleTime    # idle connections older are closed
+        self.check = check
+        self.inTransaction = inTransaction or (lambda conn: False)
+        self.idle = []              # (connection, time returned)
+        self.open = 0               # connections idle or checked out
+        self.cond = threading.Condition()
+        self.local = threading.local()
+        self.started = time.monotonic()
+        self.stats = {"checkouts": 0, "created": 0, "evicted": 0,
+                      "failedChecks": 0, "waits": 0, "timeouts": 0,
+                      "waitTime": 0.0, "maxWait": 0.0, "busyTime": 0.0,
+                      "inUse": 0, "peakInUse": 0}
+        self.outSince = {}          # id(connection) -> checkout time
+
+    # takes a connection from the pool, waiting if all are in use
+    def checkout(self):
+        start = time.monotonic()
+        waited = False
+        with self.cond:
+            while True:
+                self.evictIdle()
+                if self.idle:
+                    conn = self.idle.pop()[0]   # most recently used
+                    if not self.healthy(conn):
+                        continue
+                    break
+                if self.open < self.size:
+                    self.open += 1
+                    try:
+                        conn = self.connect()
+                    except Exception:
+                        self.open -= 1
+                        raise
+                    self.stats["created"] += 1
+                    break
+                waited = True
+                if self.timeout is None:
+                    self.cond.wait()
+                    continue
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0 or not self.cond.wait(remaining):
+                    self.stats["timeouts"] += 1
+                    self.countWait(time.monotonic() - start)
+                    raise TimeoutError("no database connection free")
+            now = time.monotonic()
+            stats = self.stats
+            stats["checkouts"] += 1
+            if waited:
+                self.countWait(now - start)
+            stats["inUse"] += 1
+            stats["peakInUse"] = max(stats["peakInUse"], stats["inUse"])
+            self.outSince[id(conn)] = now
+            return conn
+
+    # adds one wait, whether or not it got a connection
+    def countWait(self, seconds):
+        self.stats["waits"] += 1
+        self.stats["waitTime"] += seconds
+        self.stats["maxWait"] = max(self.stats["maxWait"], seconds)
+
+    # puts a connection back for other threads
+    def checkin(self, conn):
+        with self.cond:
+            now = time.monotonic()
+            self.stats["busyTime"] += now - self.outSince.pop(id(conn), now)
+            self.stats["inUse"] -= 1
+            self.idle.append((conn, now))
+            self.cond.notify()
+
+    # a connection checked out for the length of a with block
+    @contextmanager
+    def connection(self):
+        conn = self.checkout()
+        try:
+            yield conn
+        finally:
+            self.checkin(conn)
+
+    # the calling thread's lease, checking a connection out if
+    # it holds none, and counting one more cursor using it
+    def acquire(self):
+        lease = self.current()
+        if lease is None:
+            conn = self.checkout()
+            lease = self.local.lease = Lease(conn)
+            # also given back if the thread ends still holding it
+            lease.giveBack = weakref.finalize(lease, self.giveBack, conn)
+        lease.users += 1
+        return lease
+
+    # the calling thread's lease, or None
+    def current(self):
+        lease = getattr(self.local, "lease", None)
+        if lease is None or not lease.giveBack.alive:
+            return None
+        return lease
+
+    # a cursor has finished with the lease
+    def releaseLease(self, lease):
+        lease.users -= 1
+        self.endLease(lease)
+
+    # gives the connection back once no cursor uses it
+    # and no transaction is open on it
+    def endLease(self, lease):
+        if lease.users <= 0 and not self.inTransaction(lease.conn):
+            lease.giveBack()    # runs only once
+
+    # ends the calling thread's transaction, if it has one
+    def commit(self):
+        lease = self.current()
+        if lease is not None:
+            lease.conn.commit()
+            self.endLease(lease)
+
+    def rollback(self):
+        lease = self.current()
+        if lease is not None:
+            lease.conn.rollback()
+            self.endLease(lease)
+
+    # gives the calling thread's connection back at once,
+    # rolling back anything it has not committed
+    def release(self):
+        lease = self.current()
+        if lease is not None:
+            lease.giveBack()
+
+    # uncommitted work is never handed on to another thread
+    def giveBack(self, conn):
+        if self.inTransaction(conn):
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        self.checkin(conn)
+
+    # runs the health check, closing the connection if it fails
+    def healthy(self, conn):
+        if self.check is None:
+            return True
+        try:
+            self.check(conn)
+            return True
+        except Exception:
+            self.stats["failedChecks"] += 1
+            self.discard(conn)
+            return False
+
+    # closes connections idle longer than idleTime
+    def evictIdle(self):
+        limit = time.monotonic() - self.idleTime
+        while self.idle and self.idle[0][1] < limit:
+            self.stats["evicted"] += 1
+            self.discard(self.idle.pop(0)[0])
+
+    def discard(self, conn):
+        self.open -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self.cond.notify()
+
+    # counters, plus utilization: the share of the pool's
+    # connection time spent checked out since it was made
+    def getStats(self):
+        with self.cond:
+            stats = dict(self.stats)
+            now = time.monotonic()
+            busy = stats["busyTime"] + sum(now - t
+                                           for t in self.outSince.values())
+            stats["open"] = self.open
+            stats["idle"] = len(self.idle)
+            stats["utilization"] = busy / max((now - self.started)
+                                              * self.size, 1e-9)
+            return stats
+
+    # closes the idle connections
+    def close(self):
+        with self.cond:
+            while self.idle:
+                self.discard(self.idle.pop()[0])
+
+# one thread's use of a pooled connection
+class Lease():
+    def __init__(self, conn):
+        self.conn = conn
+        self.users = 0          # cursors with a statement open
+        self.giveBack = None    # set by the pool
+
+# A cursor on a ConnectionPool. Each statement runs on the calling
+# thread's leased connection, which is held only until the rows
+# have been read, the cursor is closed or the next statement runs
+class PooledCursor():
+    def __init__(self, pool):
+        self.pool = pool
+        self.lease = None
+        self.cursor = None      # the driver's cursor, kept when done
+
+    def execute(self, sql, params=()):
+        return self.run("execute", sql, params)
+
+    def executemany(self, sql, rows):
+        self.run("executemany", sql, rows)
+        self.finish()
+        return self
+
+    # runs a statement on a fresh driver cursor
+    def run(self, method, sql, args):
+        self.finish()
+        self.lease = self.pool.acquire()
+        try:
+            self.cursor = self.lease.conn.cursor()
+            getattr(self.cursor, method)(sql, args)
+        except BaseException:
+            self.finish()
+            raise
+        if self.cursor.description is None:
+            self.finish()       # no rows to read
+        return self
+
+    def fetchone(self):
+        row = self.cursor.fetchone() if self.lease is not None else None
+        if row is None:
+            self.finish()
+        return row
+
+    def fetchmany(self, size=None):
+        if self.lease is None:
+            return []
+        rows = self.cursor.fetchmany(size or self.cursor.arraysize)
+        if not rows:
+            self.finish()
+        return rows
+
+    def fetchall(self):
+        rows = self.cursor.fetchall() if self.lease is not None else []
+        self.finish()
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    # another cursor on the same pool, for Results
+    def newCursor(self):
+        return PooledCursor(self.pool)
+
+    # stops reading and gives the connection back
+    def close(self):
+        self.finish()
+
+    def finish(self):
+        lease = self.lease
+        if lease is not None:
+            self.lease = None
+            self.cursor.close()
+            self.pool.releaseLease(lease)
+
+    def __del__(self):
+        self.finish()
+
+    # rowcount, description and so forth come from the last statement
+    def __getattr__(self, name):
+        if name == "cursor":
+            raise AttributeError(name)
+        return getattr(self.cursor, name)
+
+# Opt in cache of query results, keyed by the SQL with its
+# spacing normalized and the bound arguments.
+# Entries are dropped least recently used first when there are
+# more than maxEntries or they take more than maxBytes, and when
+# a write through the facade names one of their tables
+class ResultCache():
+    literals = re.compile(r"'(?:[^']|'')*'|\s+")
+    words = re.compile(r"'(?:[^']|'')*'|([A-Za-z_]\w*)")
+    writes = {"insert", "update", "delete", "replace"}
+    schemaChanges = {"create", "drop", "alter"}
+
+    def __init__(self, maxBytes=16 * 2**20, maxEntries=1024):
+        self.maxBytes = maxBytes
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()    # key -> (rows, tables, size)
+        self.bytes = 0
+        self.generation = 0             # counts the writes
+        self.changed = {}               # table -> generation of last write
+        self.cleared = 0                # generation of the last clear
+        self.lock = threading.Lock()
+        self.local = threading.local()  # writes not yet committed
+        self.stats = {"hits": 0, "misses": 0, "stored": 0,
+                      "evicted": 0, "invalidated": 0}
+
+    # one key for statements differing only in spacing
+    def makeKey(self, sql, params):
+        sql = self.literals.sub(lambda m: m.group(0)
+                                if m.group(0).startswith("'") else " ", sql)
+        return (sql.strip().rstrip(";"), tuple(params))
+
+    # every name in the SQL that could be a table
+    def tableNames(self, sql):
+        return frozenset(w.lower() for w in self.words.findall(sql) if w)
+
+    # the first word of a statement
+    def verb(self, sql):
+        words = sql.split(None, 1)
+        return words[0].lower() if words else ""
+
+    # true if the statement changes the database
+    def isWrite(self, sql):
+        return self.verb(sql) in self.writes | self.schemaChanges
+
+    # the rows of an earlier identical query, or None
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return list(entry[0])
+
+    # collects the rows of a query as they are read
+    def collector(self, key, sql):
+        with self.lock:
+            return ResultCollector(self, key, self.tableNames(sql),
+                                   self.generation)
+
+    # keeps the rows, unless a table changed while they were read
+    def put(self, key, rows, tables, size, started):
+        with self.lock:
+            if self.cleared > started or \
+                    any(self.changed.get(t, -1) > started for t in tables):
+                return
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            self.entries[key] = (rows, tables, size)
+            self.bytes += size
+            self.stats["stored"] += 1
+            while self.entries and (self.bytes > self.maxBytes or
+                                    len(self.entries) > self.maxEntries):
+                self.bytes -= self.entries.popitem(last=False)[1][2]
+                self.stats["evicted"] += 1
+
+    # a write statement ran: drop the entries naming its tables
+    # a change of schema drops everything
+    def written(self, sql):
+        if self.verb(sql) in self.schemaChanges:
+            self.clear()
+        else:
+            self.invalidate(*self.tableNames(sql))
+
+    # a write ran in this thread's open transaction: its entries
+    # go now and again when it ends, since other connections
+    # may cache the old rows until the commit
+    def wrote(self, sql):
+        self.written(sql)
+        pending = getattr(self.local, "pending", None)
+        if pending is None:
+            pending = self.local.pending = []
+        pending.append(sql)
+
+    # this thread committed or rolled back
+    def transactionEnded(self):
+        pending = getattr(self.local, "pending", None)
+        if pending:
+            self.local.pending = []
+            for sql in pending:
+                self.written(sql)
+
+    # drops the entries that use any of the tables
+    def invalidate(self, *tables):
+        tables = {t.lower() for t in tables}
+        with self.lock:
+            self.generation += 1
+            for t in tables:
+                self.changed[t] = self.generation
+            for key in [k for k, e in self.entries.items()
+                        if not tables.isdisjoint(e[1])]:
+                self.bytes -= self.entries.pop(key)[2]
+                self.stats["invalidated"] += 1
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.cleared = self.generation
+            self.stats["invalidated"] += len(self.entries)
+            self.entries.clear()
+            self.bytes = 0
+
+    def getStats(self):
+        with self.lock:
+            return dict(self.stats, entries=len(self.entries),
+                        bytes=self.bytes)
+
+
+# the rows of one query on their way into the ResultCache
+# rows too big for the cache are not kept at all
+class ResultCollector():
+    def __init__(self, cache, key, tables, started):
+        self.cache = cache
+        self.key = key
+        self.tables = tables
+        self.started = started
+        self.rows = []
+        self.size = sys.getsizeof(self.rows)
+
+    # adds a batch, returning False once it no longer fits
+    def add(self, rows):
+        for row in rows:
+            self.size += sys.getsizeof(row) + sum(map(sys.getsizeof, row))
+        self.rows.extend(rows)
+        return self.size <= self.cache.maxBytes
+
+    # all the rows have been read
+    def finish(self):
+        self.cache.put(self.key, self.rows, self.tables, self.size,
+                       self.started)
+
+
+# runs a statement on a new cursor and returns its Results
+# with a cache, selects run before are answered from memory
+# and writes drop the results they make stale
+def runQuery(cursor, sql, params, batch, cache):
+    if cache is not None and not cache.isWrite(sql):
+        key = cache.makeKey(sql, params)
+        rows = cache.get(key)
+        if rows is not None:
+            return Results(rows)
+        cursor = ownCursor(cursor)
+        cursor.execute(sql, params)
+        return Results(cursor=cursor, batch=batch,
+                       collector=cache.collector(key, sql))
+    cursor = ownCursor(cursor)
+    cursor.execute(sql, params)
+    if cache is not None:
+        cache.wrote(sql)
+    return Results(cursor=cursor, batch=batch)
+
 # base class Column
 class Column():
     def __init__(self, name):
@@ -39,58 +561,111 @@ class Primary() :
     primaryString = ""
 
 # Query object makes queries and returns Results
+# batch is the number of rows the Results fetch at a time
+# and cache an optional ResultCache
 class Query():
-    def __init__(self, cursor, *qstring):
+    def __init__(self, cursor, *qstring, batch=None, cache=None):
         self.qstring = qstring[0]
         self.multiple=False
         if len(qstring) >1:
             self.vals = qstring[1]
             self.multiple = True
         self.cursor = cursor
+        self.batch = batch
+        self.cache = cache
 
-        # executes the query and returns all the results
+        # executes the query and returns the results,
+        # which are fetched as they are read
     def execute(self):
         print (self.qstring)
         if not self.multiple:
-            self.cursor.execute(self.qstring)
-            rows = self.cursor.fetchall()
-            return Results(rows)
+            return runQuery(self.cursor, self.qstring, (), self.batch,
+                            self.cache)
         else:
             self.cursor.executemany(self.qstring, self.vals)
+            self.written()
 
     def executeMultiple(self, vals):
         print (self.qstring, vals)
         self.cursor.executemany(self.qstring, vals)
+        self.written()
+
+    # drops the cached results the statement made stale
+    def written(self):
+        if self.cache is not None:
+            self.cache.wrote(self.qstring)
+
+
+# most recently used queries with ?0, ?1 ... compiled to the
+# driver's placeholders, shared by all the VariableQuery objects
+class StatementCache():
+    # string literals are skipped, so '?0' in quotes is left alone
+    placeholder = re.compile(r"'(?:[^']|'')*'|\?(\d+)")
+    markers = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+
+    def __init__(self, size=128):
+        self.size = size
+        self.statements = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # returns (sql, argument numbers in placeholder order)
+    def compile(self, qstring, paramstyle="qmark"):
+        key = (qstring, paramstyle)
+        with self.lock:
+            statement = self.statements.get(key)
+            if statement is not None:
+                self.statements.move_to_end(key)
+                self.hits += 1
+                return statement
+            self.misses += 1
+        order = []
+        marker = self.markers[paramstyle]
+
+        def replace(m):
+            if m.group(1) is None:
+                return m.group(0)   # a quoted string
+            order.append(int(m.group(1)))
+            return marker
+        statement = (self.placeholder.sub(replace, qstring), tuple(order))
+        with self.lock:
+            self.statements[key] = statement
+            if len(self.statements) > self.size:
+                self.statements.popitem(last=False)
+        return statement
 
 
 # Query object makes queries and returns Results
+# ?0, ?1 ... in the query are bound to the arguments of insertArgs
 class VariableQuery():
-    def __init__(self, cursor, qstring):
+    statements = StatementCache()
+
+    def __init__(self, cursor, qstring, paramstyle="qmark", batch=None,
+                 cache=None):
         self.qstringMaster = qstring  #master copy
-        self.qstring = self.qstringMaster
+        # the SQL with driver placeholders is made only once
+        self.qstring, self.order = self.statements.compile(qstring,
+                                                           paramstyle)
         self.cursor = cursor
+        self.params = ()
+        self.batch = batch
+        self.cache = cache
 
-    # copies master and inserts arguments into it
+    # binds the arguments to ?0, ?1 etc
     def insertArgs(self, *args):
-        index = 0
-        self.qstring = self.qstringMaster
-        # replaces ?0, ?1 etc with the provided args
-        # to create a revised query
-        for arg in args:
-            tempstr = "?" + str(index)
-            self.qstring = self.qstring.replace(tempstr, "'" + arg + "'")
-            index += 1
-
-    # executes the query and returns all the results
+        self.params = tuple(args[i] for i in self.order)
+
+    # executes the query and returns the results,
+    # which are fetched as they are read
     def execute(self):
-        print (self.qstring)
-        self.cursor.execute(self.qstring)
-        rows = self.cursor.fetchall()
-        return Results(rows)
+        print (self.qstring, self.params)
+        return runQuery(self.cursor, self.qstring, self.params, self.batch,
+                        self.cache)
 
     #executes the query and returns only the first result
     def executeFetchone(self):
-        self.cursor.execute(self.qstring)
+        self.cursor.execute(self.qstring, self.params)
         rows = self.cursor.fetchone()
         return Results(rows)
 
@@ -133,6 +708,8 @@ class Charcol(Column):
         return idname
 
 class Table():
+    marker = "%s"       # the driver's parameter placeholder
+
     def __init__(self, db, name):
         self.cursor = db.cursor()
         self.db = db
@@ -151,40 +728,185 @@ class Table():
     def name(self):     # gets table name
         return self.tname
 
+    # the name as a string, tables from getTables have a tuple
+    def tableName(self):
+        return self.tname if isinstance(self.tname, str) else self.tname[0]
+
+    # the result cache of the database, if it has one
+    def getCache(self):
+        return getattr(getattr(self, "db", None), "resultCache", None)
+
     # get contents of a column
+    # the rows are fetched in batches as the Results are read
     def getColumnContents(self, cname):
         query = Query(self.cursor, "select " + cname + " from "
-                      + self.tname[0])
-        results = query.execute()
-        return results.getRows()
+                      + self.tableName(), cache=self.getCache())
+        return query.execute()
 
     # add a column
     def addColumn(self, column):
         self.colList.append(column)
 
+    # the names of the columns added, or else those in the database
+    def columnNames(self):
+        if self.colList:
+            return [c.name for c in self.colList]
+        return [row[0] for row in self.getColumns()]
+
+    # the insert statement for the given columns, by default all
+    # of them, which is made only once
+    def insertSql(self, columns=None):
+        sql = None if columns else getattr(self, "_insertSql", None)
+        if sql is None:
+            names = columns or self.columnNames()
+            marks = ",".join([self.marker] * len(names))
+            sql = ("insert into " + self.tableName() + "(" + ",".join(names)
+                   + ") values (" + marks + ")")
+            if not columns:
+                self._insertSql = sql
+        return sql
+
     # creates the sql to make the columbs
     def addRows(self, varnames):
-        qry = "insert into "+self.tname +"("
-        i = 0
-        for i in range(0, len(self.colList)-1):
-            c = self.colList[i]
-            qry += c.name + ","
-        qry += self.colList[-1].name+") values ("
-        for i in range(0, len(self.colList) - 1):
-            qry += "%s,"
-        qry +="%s)"
-        query = Query(self.cursor, qry, varnames)
+        query = Query(self.cursor, self.insertSql(), varnames,
+                      cache=self.getCache())
         query.execute()
         self.db.commit()
 
+    # loads any number of rows, from an iterable or a CSV file,
+    # into the given columns or all of them
+    # returns the BulkLoader with its rows and rows/sec
+    def bulkLoad(self, rows, chunk=10000, transaction=500000,
+                 pragmas=None, report=True, columns=None):
+        loader = BulkLoader(self, chunk, transaction, pragmas, columns)
+        loader.load(rows)
+        if report:
+            print(loader)
+        return loader
+
+# Loads rows into a table with one executemany per chunk of rows
+# and a commit every transaction rows, never printing the rows.
+# pragmas, such as {"journal_mode": "WAL", "synchronous": "OFF"},
+# are set for the load and put back afterwards (SQLite only)
+class BulkLoader():
+    def __init__(self, table, chunk=10000, transaction=500000,
+                 pragmas=None, columns=None):
+        self.table = table
+        self.columns = columns
+        self.chunk = chunk
+        self.transaction = max(transaction, chunk)
+        self.pragmas = pragmas or {}
+        self.rows = 0
+        self.seconds = 0.0
+
+    def load(self, rows):
+        if hasattr(rows, "read"):
+            rows = csv.reader(rows)     # a CSV stream
+        rows = iter(rows)
+        cursor = self.table.cursor
+        sql = self.table.insertSql(self.columns)
+        start = time.perf_counter()
+        self.table.db.commit()      # pragmas are set outside transactions
+        saved = self.setPragmas(cursor, self.pragmas)
+        pending = 0
+        try:
+            while True:
+                batch = list(islice(rows, self.chunk))
+                if not batch:
+                    break
+                cursor.executemany(sql, batch)
+                self.rows += len(batch)
+                pending += len(batch)
+                if pending >= self.transaction:
+                    self.table.db.commit()
+                    pending = 0
+            self.table.db.commit()
+        except BaseException:
+            # the open transaction must end before the pragmas
+            # can be put back, and its rows are not loaded
+            self.table.db.rollback()
+            self.rows -= pending
+            raise
+        finally:
+            self.setPragmas(cursor, saved)
+            self.seconds = time.perf_counter() - start
+            cache = self.table.getCache()
+            if cache is not None:
+                cache.written(sql)
+
+    # sets the pragmas and returns their old values
+    def setPragmas(self, cursor, pragmas):
+        saved = {}
+        for name, value in pragmas.items():
+            saved[name] = cursor.execute("PRAGMA " + name).fetchone()[0]
+            cursor.execute("PRAGMA " + name + "=" + str(value))
+        return saved
+
+    def getRate(self):
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self):
+        return (f"{self.table.tableName()}: {self.rows} rows in "
+                f"{self.seconds:.2f} s, {self.getRate():,.0f} rows/sec")
+
+# a new cursor on the same connection, or pool, so that Results
+# can fetch their rows while other queries use the first cursor
+def ownCursor(cursor):
+    newCursor = getattr(cursor, "newCursor", None)
+    if newCursor is not None:
+        return newCursor()
+    connection = getattr(cursor, "connection", None)
+    if connection is None:
+        return cursor
+    return connection.cursor()
+
 # contains the result of a query
+# Given a cursor, the rows are fetched lazily, batch rows at a
+# time, so a large select is never held in memory all at once
+# A collector is given the rows for the ResultCache as they come
 class Results():
-    def __init__(self, rows):
-        self.rows = rows
+    batchSize = 1000
 
+    def __init__(self, rows=None, cursor=None, batch=None, collector=None):
+        self.rows = rows
+        self.cursor = cursor
+        self.batch = batch or Results.batchSize
+        self.collector = collector
+
+    # Lists of up to batch rows, as they are fetched
+    def batches(self):
+        if self.rows is not None:
+            yield self.rows
+            return
+        while self.cursor is not None:
+            rows = self.cursor.fetchmany(self.batch)
+            if not rows:
+                if self.collector is not None:
+                    self.collector.finish()     # all read, so cache it
+                self.close()
+                break
+            if self.collector is not None and not self.collector.add(rows):
+                self.collector = None   # too big to cache
+            yield rows
+
+    def __iter__(self):
+        for rows in self.batches():
+            yield from rows
+
+    # all the rows not yet read, kept for later calls
     def getRows(self):
+        if self.rows is None:
+            self.rows = list(self)
         return self.rows
 
+    # stops fetching and closes the cursor
+    # rows not read to the end are not cached
+    def close(self):
+        self.collector = None
+        if self.cursor is not None:
+            self.cursor.close()
+            self.cursor = None
+
 
 
 
@@ -4,7 +4,7 @@ DBObjects contains only 4 objects: Database, Query, Table and Results
 The Query class supports replacement of arguments if the string ?0, ?1
 and so forth are in the query. So replaces Apple with Oranges is very simple"""
 
-from DBObjects import *
+from DBobjects import *
 import tkinter as tk
 from tkinter import Listbox, GROOVE, SINGLE, NO, END, mainloop
 from tkinter.ttk import Button,Frame, Treeview
@@ -42,6 +42,7 @@ class Builder():
     def build(self):
         #db = Database("localhost", "newuser", "new_user","groceries")
         db = SqltDatabase("groceries.db")
+        db.enableCache()    # repeated lookups are answered from memory
         self.cursor = db.cursor
         print(self.cursor)
         self.cursor.execute("select name from sqlite_master where type='table'")
@@ -55,7 +56,8 @@ class Builder():
         "join stores on  (stores.storekey = prices.storekey ) "+
         "where foods.foodname=?0 order by price")
         # create the query with replaceable argument
-        self.foodQuery = VariableQuery (self.cursor, qstring)
+        self.foodQuery = VariableQuery (self.cursor, qstring,
+                                        cache=db.resultCache)
 
         self.root.geometry ("400x300")
         self.root.title("Grocery queries")
@@ -127,10 +129,13 @@ class Builder():
         index = self.midlist.curselection()
         if len(index) > 0:
             midname = self.midlist.get(index[0])
-            rows = self.table.getColumnContents(midname)
+            results = self.table.getColumnContents(midname)
             self.rightlist.delete(0, END)
-            for r in rows:
-                self.rightlist.insert(END, r[0])
+            # each batch is shown as soon as it is fetched
+            for rows in results.batches():
+                self.rightlist.insert(END, *[r[0] for r in rows])
+                self.rightlist.update_idletasks()
+            results.close()
 
 
 # --program starts here---
@@ -5,7 +5,7 @@ The Query class supports replacement of arguments if the string ?0, ?1
 and so forth are in the query. So replaces Apple with Oranges is very simple"""
 
 
-from DBObjects import *
+from DBobjects import *
 import tkinter as tk
 from tkinter import Listbox, GROOVE, SINGLE, NO, END, mainloop
 from tkinter.ttk import Button,Frame, Treeview
@@ -59,7 +59,8 @@ class Builder():
                    "join stores on  (stores.storekey = prices.storekey ) " +
                    "where foods.foodname=?0 order by price")
         # create the query with replaceable argument
-        self.foodQuery = VariableQuery (self.cursor, qstring)
+        # pymysql binds arguments with %s placeholders
+        self.foodQuery = VariableQuery (self.cursor, qstring, "format")
 
         self.root.geometry ("400x300")
         self.root.title("Grocery queries")
@@ -0,0 +1,100 @@
+"""Times repeated grocery price lookups two ways:
+pasting the food and store names into the SQL text, as VariableQuery
+once did, so that SQLite parses and plans every query afresh, and
+binding them as parameters, so the same prepared statement is reused.
+The database is made by DataGen with --prices price rows.
+The saving is the parse and plan time of each statement, so prices
+are indexed by food and store to keep running the lookup cheap, and
+up to --pairs food and store pairs are looked up. That is more than
+the driver's own cache of 128 statement texts, which would otherwise
+hide the cost of pasting. Both ways run on the same driver cursor
+and fetch the same way, so only the statement text differs."""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from DBobjects import VariableQuery
+from SqltDatabase import SqltDatabase
+
+# the data generators are shared with the swim examples
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, "SwimCommon"))
+from DataGen import generate
+
+QUERY = ("select foods.foodname, stores.storename, prices.price from prices "
+         "join foods on (foods.foodkey=prices.foodkey) "
+         "join stores on (stores.storekey = prices.storekey) "
+         "where foods.foodname=?0 and stores.storename=?1 order by price")
+
+
+# the old way: a new statement text for every pair of names
+def pastedLookup(cursor, query, foodname, storename):
+    sql = query.qstringMaster.replace("?0", "'" + foodname + "'")
+    cursor.execute(sql.replace("?1", "'" + storename + "'"))
+    return cursor.fetchall()
+
+
+# the bound way: one statement, the names as parameters
+# the statement was compiled once by VariableQuery
+def boundLookup(cursor, query, foodname, storename):
+    query.insertArgs(foodname, storename)
+    cursor.execute(query.qstring, query.params)
+    return cursor.fetchall()
+
+
+# microseconds per lookup for each way, the best of rounds
+# the ways take turns within every round, so that both see
+# the same machine load
+def timeLookups(lookups, pairs, repeat, rounds=7):
+    best = [None] * len(lookups)
+    for r in range(rounds):
+        for k, lookup in enumerate(lookups):
+            start = time.perf_counter()
+            for i in range(repeat):
+                for foodname, storename in pairs:
+                    lookup(foodname, storename)
+            elapsed = time.perf_counter() - start
+            best[k] = elapsed if best[k] is None else min(best[k], elapsed)
+    return [b * 1e6 / (repeat * len(pairs)) for b in best]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prices", type=int, default=20000)
+    parser.add_argument("--pairs", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        dbname = generate("groceries", args.prices, 0,
+                          os.path.join(folder, "groceries.db"))
+        db = SqltDatabase(dbname)
+        cursor = db.cursor
+        cursor.execute("create index foodnames on foods (foodname)")
+        cursor.execute("create index storenames on stores (storename)")
+        cursor.execute("create index pricefoods on prices (foodkey, storekey)")
+        pairs = cursor.execute("select foodname, storename from foods, "
+                               "stores limit ?", (args.pairs,)).fetchall()
+        query = VariableQuery(cursor, QUERY)
+
+        # both ways run on one driver cursor and fetch the same
+        # way, so only the parsing and planning differ
+        conn = db.connect()
+        raw = conn.cursor()
+        pasted, bound = timeLookups(
+            [lambda food, store: pastedLookup(raw, query, food, store),
+             lambda food, store: boundLookup(raw, query, food, store)],
+            pairs, args.repeat)
+        conn.close()
+        print(f"{args.prices} prices, {len(pairs)} food and store pairs")
+        print(f"pasted into the SQL {pasted:9.1f} us per lookup")
+        print(f"bound parameters    {bound:9.1f} us per lookup")
+        db.release()
+
+
+###  Here we go  ####
+if __name__ == "__main__":
+    main()
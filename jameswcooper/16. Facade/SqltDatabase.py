@@ -1,53 +1,97 @@
 #from GroceryDisplay import Database
-from DBObjects import Database, Query, VariableQuery, Table, Primary
+from DBobjects import Database, Query, VariableQuery, Table, Primary
+from DBobjects import ConnectionPool, PooledCursor
 import sqlite3
+import threading
 
+# SQLite database with a pool of connections, so several threads
+# can query at once; a thread holds a connection only while it
+# reads a statement's rows or has uncommitted writes
 class SqltDatabase(Database):
-    def __init__(self, dbname):
-        self._db = sqlite3.connect(dbname)
+    def __init__(self, dbname, poolSize=4, timeout=30.0, idleTime=300.0,
+                 statementCache=128):
         self._dbname = dbname
-        self._cursor = self._db.cursor()
+        self._statementCache = statementCache   # prepared per connection
+        self._pool = ConnectionPool(self.connect, poolSize, timeout,
+                                    idleTime, self.check,
+                                    self.inTransaction)
+        self._local = threading.local()
 
+    # a connection that may be handed from thread to thread
+    def connect(self):
+        return sqlite3.connect(self._dbname, check_same_thread=False,
+                               cached_statements=self._statementCache)
+
+    # fails if the connection can no longer be used
+    def check(self, conn):
+        conn.execute("select 1")
+
+    def inTransaction(self, conn):
+        return conn.in_transaction
+
+    # the calling thread's cursor, which runs each statement
+    # on a pooled connection
+    @property
+    def _cursor(self):
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = PooledCursor(self._pool)
+        return cursor
+
+    # commits or rolls back the calling thread's writes
     def commit(self):
-        self._db.commit()
+        self._pool.commit()
+        if self.resultCache is not None:
+            self.resultCache.transactionEnded()
+
+    def rollback(self):
+        self._pool.rollback()
+        if self.resultCache is not None:
+            self.resultCache.transactionEnded()
+
+    # gives the calling thread's connection back to the pool,
+    # rolling back anything not committed
+    def release(self):
+        self._pool.release()
+
+    # pool wait times and utilization
+    def getPoolStats(self):
+        return self._pool.getStats()
 
     def create(self, dbname):
         pass
     def getTables(self):
         tbQuery = Query(self.cursor,
-                        "select name from sqlite_master where type='table'")
+                        "select name from sqlite_master where type='table'",
+                        cache=self.resultCache)
 
         # create array of table objects
         self.tables=[]
         rows = tbQuery.execute().getRows()
         for r in rows:
-            self.tables.append(SqltTable(self._db, r))
+            self.tables.append(SqltTable(self, r))
         return self.tables
 
 # Table class used to create all the table
+# the cursor is the calling thread's, from the database pool
 class SqltTable(Table):
+    marker = "?"
+
     def __init__(self, db, name):
-        self.cursor = db.cursor()
         self.db = db
         self.tname = name   # first of tuple
         self.colList=[]     # list of column names generated
         self._primarystring = ""
 
 
-    # creates the sql to make the columns--Sqlite differs slightly
+    @property
+    def cursor(self):
+        return self.db.cursor
+
+    # inserts the rows--Sqlite differs slightly
     def addRows(self, varnames):
-        qry = "insert into "+self.tname +"("
-        i = 0
-        for i in range(0, len(self.colList)-1):
-            c = self.colList[i]
-            qry += c.name + ","
-
-        qry += self.colList[-1].name+") values ("
-        for i in range(0, len(self.colList) - 1):
-            qry += "?,"
-        qry +="?);"
-
-        query = Query(self.cursor, qry, varnames)
+        qry = self.insertSql()
+        query = Query(self.cursor, qry, varnames, cache=self.getCache())
         print(qry+"\n", varnames)
         query.execute()
         self.db.commit()
@@ -62,9 +106,11 @@ class SqltTable(Table):
         sql +=");"
         print (sql)
         self.cursor.execute(sql)
+        if self.getCache() is not None:
+            self.getCache().wrote(sql)
 
     def getColumns(self):
-        tn = self.tname[0]
+        tn = self.tableName()
         print(self.tname)
         sql="select name from pragma_table_info('"+tn+"')"
         print(sql)
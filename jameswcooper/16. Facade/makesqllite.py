@@ -1,9 +1,13 @@
+import argparse
+import random
 import sqlite3
-from DBObjects import Database, Query, Table,Intcol,Primary,Floatcol, Charcol
-from DBObjects import Column
+from DBobjects import Database, Query, Table,Intcol,Primary,Floatcol, Charcol
+from DBobjects import Column
 
 """This program uses the Table and Query classes to generate the SQL
-to create the groceries database described in the Facade chapter."""
+to create the groceries database described in the Facade chapter.
+With --prices N the price table is filled with N generated rows
+by the bulk loader instead, for testing at a large scale."""
 class SqltDatabase(Database):
     def __init__(self, *args):
         self._db = sqlite3.connect(args[0])
@@ -20,6 +24,8 @@ class SqltDatabase(Database):
 
 # Table class used to create all the table
 class SqltTable(Table):
+    marker = "?"
+
     def __init__(self, db, name):
         self.cursor = db.cursor
         self.db = db
@@ -28,26 +34,17 @@ class SqltTable(Table):
         self._primarystring = ""
 
 
-    # creates the sql to make the columns--Sqlite differs slightly
+    # inserts the rows--Sqlite differs slightly
     def addRows(self, varnames):
-        qry = "insert into "+self.tname +"("
-        i = 0
-        for i in range(0, len(self.colList)-1):
-            c = self.colList[i]
-            qry += c.name + ","
-
-        qry += self.colList[-1].name+") values ("
-        for i in range(0, len(self.colList) - 1):
-            qry += "?,"
-        qry +="?);"
-
+        qry = self.insertSql()
         query = Query(self.cursor, qry, varnames)
         print(qry+"\n", varnames)
         query.execute()
         self.db.commit()
 
-    # creates the table and columns
+    # creates the table and columns, replacing any old one
     def create(self):
+        self.cursor.execute("drop table if exists " + self.name)
         sql = "create table " +  self.name + " ("
         for col in self.colList:
             sql += col.getName()+","
@@ -58,10 +55,28 @@ class SqltTable(Table):
         self.cursor.execute(sql)
 
 
+# generated (pricekey, foodkey, storekey, price) rows
+# the same seed always gives the same prices
+def priceRows(count, numFoods, numStores, seed=0):
+    rand = random.Random(seed)
+    for key in range(1, count + 1):
+        yield (key, rand.randint(1, numFoods), rand.randint(1, numStores),
+               round(rand.uniform(0.2, 5.0), 2))
+
+
 # program starts here
 class Builder():
+    def __init__(self, dbname="groceries.db", prices=0, chunk=10000,
+                 fast=False):
+        self.dbname = dbname
+        self.prices = prices    # 0 for the prices in the book
+        self.chunk = chunk
+        # WAL journal and no syncing while the rows are loaded
+        self.pragmas = {"journal_mode": "WAL",
+                        "synchronous": "OFF"} if fast else None
+
     def build(self):
-        db = SqltDatabase("groceries.db")
+        db = SqltDatabase(self.dbname)
         #db.create("groceries2")
         #med = Mediator(db)  #keeps the primary key string
 
@@ -108,12 +123,24 @@ class Builder():
                 (18,   4,   3,  3.29),  (19,   5,   3,  1.89),
                 (20,   6,   3,  2.99),  (21,   7,   3,  1.99)
         ]
-        pricetable.addRows(vals)
+        if self.prices > 0:
+            pricetable.bulkLoad(priceRows(self.prices, 7, 3), self.chunk,
+                                pragmas=self.pragmas)
+        else:
+            pricetable.addRows(vals)
 
 
 # --program starts here---
 def main():
-    bld = Builder()
+    parser = argparse.ArgumentParser(description="Builds groceries.db")
+    parser.add_argument("--db", default="groceries.db")
+    parser.add_argument("--prices", type=int, default=0,
+                        help="number of generated price rows")
+    parser.add_argument("--chunk", type=int, default=10000)
+    parser.add_argument("--fast", action="store_true",
+                        help="WAL journal and synchronous=OFF for the load")
+    args = parser.parse_args()
+    bld = Builder(args.db, args.prices, args.chunk, args.fast)
     bld.build()
 
 ###  Here we go  ####
@@ -0,0 +1,705 @@
+"""Parser, Verbs and Variables shared by the console
+and the Tk versions of the Interpreter example.
+The parser uses stack reduction to reduce the tokens
+to verbs and variables"""
+
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+from itertools import chain, islice, repeat
+from operator import attrgetter
+import os
+import re
+import sys
+
+# the columnar swimmer roster is shared by all the swim examples
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, "SwimCommon"))
+from SwimRoster import COMPARISONS, Roster, fromCentis, toCentis
+from SwimRoster import loadRoster
+
+
+# Command interface
+class Command():
+    def comd(self):pass
+
+
+# the roster behind a list of swimmers, if the list still
+# holds every row of that roster in file order
+def wholeRoster(swmrs):
+    if len(swmrs) == 0:
+        return None
+    roster = getattr(swmrs[0], "roster", None)
+    if roster is None or len(roster) != len(swmrs):
+        return None
+    for i, sw in enumerate(swmrs):
+        if sw.roster is not roster or sw.index != i:
+            return None
+    return roster
+
+# the roster and row numbers behind a list of swimmers,
+# if they all come from the same roster
+def rosterRows(swmrs):
+    if isinstance(swmrs, RowSet):
+        return swmrs.roster, swmrs.rows
+    if not isinstance(swmrs, list):
+        return None     # a merged stream from several files
+    roster = wholeRoster(swmrs)
+    if roster is not None:
+        return roster, range(len(roster))
+    if len(swmrs) == 0:
+        return None
+    roster = getattr(swmrs[0], "roster", None)
+    if roster is None:
+        return None
+    rows = []
+    for sw in swmrs:
+        if sw.roster is not roster:
+            return None
+        rows.append(sw.index)
+    return roster, rows
+
+# The rows of one roster a command works on, kept as row
+# numbers, so the verbs filter and sort with the roster's
+# indexes and Swimmer views are only made for the rows
+# that are finally printed or merged
+class RowSet():
+    def __init__(self, roster, rows=None):
+        self.roster = roster
+        self.rows = range(len(roster)) if rows is None else rows
+
+    # true while the set is every row in file order
+    def isWhole(self):
+        return self.rows == range(len(self.roster))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        row = self.roster.row
+        for index in self.rows:
+            yield row(index)
+
+    def __getitem__(self, i):
+        return self.roster.row(self.rows[i])
+
+    # del rows[n:] keeps the first n rows, as limit does
+    def __delitem__(self, key):
+        if isinstance(key, slice) and key.stop is None and \
+                key.step is None:
+            self.rows = self.rows[:key.start]
+        else:
+            rows = list(self.rows)
+            del rows[key]
+            self.rows = rows
+
+#carries out the sort by variables
+class Sorter():
+    def __init__(self, swmrs):
+        self.swmrs = swmrs
+
+    # one stable sort on the composite key of all the fields,
+    # so "sortby time thenby club" orders clubs within equal times
+    # with a limit only the first limit swimmers are selected
+    def sortby(self, *vnames, limit=None):
+        vnames = [v.lower() for v in vnames]
+        if isinstance(self.swmrs, RowSet):
+            self.sortRows(vnames, limit)
+            return
+        roster = wholeRoster(self.swmrs)
+        if roster is not None:
+            # reuse the roster's cached permutation for these fields
+            if limit is None:
+                index = roster.sortIndex(vnames)
+            else:
+                index = roster.topIndex(vnames, limit)
+            self.swmrs[:] = [roster.row(i) for i in index]
+        elif limit is None:
+            self.swmrs.sort(key=attrgetter(*vnames))
+        else:
+            # partial heap selection, stable like a full sort
+            self.swmrs[:] = heapq.nsmallest(limit, self.swmrs,
+                                            key=attrgetter(*vnames))
+
+    # sorts the row numbers of a RowSet by the roster columns
+    def sortRows(self, vnames, limit):
+        rowset = self.swmrs
+        roster = rowset.roster
+        if rowset.isWhole():
+            # reuse the roster's cached permutation for these fields
+            if limit is None:
+                rowset.rows = roster.sortIndex(vnames)
+            else:
+                rowset.rows = roster.topIndex(vnames, limit)
+        elif limit is None:
+            rowset.rows = sorted(rowset.rows, key=roster.sortKey(vnames))
+        else:
+            rowset.rows = heapq.nsmallest(limit, rowset.rows,
+                                          key=roster.sortKey(vnames))
+
+# keeps only the swimmers matching a where clause
+class Filter():
+    def __init__(self, swmrs):
+        self.swmrs = swmrs
+
+    # args are "field op value" triples joined by "and"
+    def where(self, args):
+        predicates = self.predicates(args)
+        if isinstance(self.swmrs, RowSet):
+            self.whereRows(predicates)
+            return
+        roster = wholeRoster(self.swmrs)
+        if roster is not None:
+            # answered from the roster's hash and sorted indexes
+            rows = roster.where(predicates)
+            self.swmrs[:] = [roster.row(i) for i in rows]
+        else:
+            for name, op, text in predicates:
+                self.filter(name, op, text)
+
+    # filters the row numbers of a RowSet
+    def whereRows(self, predicates):
+        rowset = self.swmrs
+        roster = rowset.roster
+        if rowset.isWhole():
+            # answered from the roster's hash and sorted indexes
+            rowset.rows = roster.where(predicates)
+            return
+        rows = rowset.rows
+        for name, op, text in predicates:
+            test = roster.rowTest(name, op, roster.parseValue(name, text))
+            rows = [row for row in rows if test(row)]
+        rowset.rows = rows
+
+    # splits the arguments into (field, op, value) triples
+    # only an "and" between triples joins them, so a value
+    # may itself be "and"
+    def predicates(self, args):
+        triples = []
+        i = 0
+        while i < len(args):
+            if len(args) - i < 3:
+                raise ValueError("where needs field, comparison and value")
+            triples.append((args[i].lower(), args[i + 1], args[i + 2]))
+            i += 3
+            if i < len(args) and args[i].lower() == "and":
+                i += 1
+        return triples
+
+    # filters a plain list one predicate at a time
+    def filter(self, name, op, text):
+        compare = COMPARISONS[op]
+        if name == "age":
+            value = int(text)
+        elif name == "time":
+            value = toCentis(text) / 100
+        else:
+            value = text
+        get = attrgetter(name)
+        self.swmrs[:] = [sw for sw in self.swmrs if compare(get(sw), value)]
+
+# hash aggregation for count, avg, min and max,
+# computed in a single pass over the roster columns
+class Aggregator():
+    functions = {"count", "avg", "min", "max"}
+    numeric = {"age", "time"}   # the fields avg can add up
+
+    def __init__(self, swmrs):
+        self.swmrs = swmrs
+
+    # returns (group, value) pairs in group order
+    def aggregate(self, func, field, group):
+        if func == "avg" and field not in self.numeric:
+            raise ValueError(f"avg needs a number field, not {field}")
+        source = rosterRows(self.swmrs)
+        if source is not None:
+            roster, items = source
+            # clubs are grouped by their code, times are centiseconds
+            getGroup = self.rosterGetter(roster, group)
+            getValue = self.rosterGetter(roster, field, values=True)
+        else:
+            items = self.swmrs
+            getGroup = attrgetter(group) if group else None
+            getValue = attrgetter(field) if field else None
+        if getGroup is None:
+            getGroup = lambda item: "all"
+
+        if func == "count":
+            results = Counter(map(getGroup, items))
+            if group is None and not results:
+                results = {"all": 0}    # nothing matched
+        elif func == "avg":
+            sums = {}
+            counts = Counter()
+            for item in items:
+                g = getGroup(item)
+                sums[g] = sums.get(g, 0) + getValue(item)
+                counts[g] += 1
+            results = {g: sums[g] / counts[g] for g in sums}
+        else:
+            better = min if func == "min" else max
+            results = {}
+            for item in items:
+                g = getGroup(item)
+                v = getValue(item)
+                results[g] = better(results[g], v) if g in results else v
+
+        if source is not None:
+            results = {self.rosterLabel(roster, group, g):
+                       self.rosterValue(field, v)
+                       for g, v in results.items()}
+        return sorted(results.items())
+
+    # function fetching a field straight from the roster columns
+    # groups use the club codes, values the real club names
+    def rosterGetter(self, roster, name, values=False):
+        if name is None:
+            return None
+        if values:
+            return roster.valueColumn(name).__getitem__
+        if name == "club":
+            return roster.clubIds.__getitem__
+        return roster.sortColumn(name).__getitem__
+
+    # converts a club code back to the club name
+    def rosterLabel(self, roster, group, g):
+        return roster.clubs[g] if group == "club" else g
+
+    # converts centiseconds back to seconds
+    def rosterValue(self, field, v):
+        return v / 100 if field == "time" else v
+
+    # lines for the list box, one per group
+    def create(self, func, field, group):
+        results = self.aggregate(func, field, group)
+        width = max((len(str(g)) for g, v in results), default=0)
+        lines = []
+        for g, v in results:
+            if field == "time" and func != "count":
+                v = fromCentis(round(v * 100))
+            elif isinstance(v, float):
+                v = f"{v:.2f}"
+            lines.append(f"{g!s:<{width}}   {v}")
+        return lines
+
+# Variable is any token that is not a verb
+class Variable():
+    def __init__(self,varname):
+        self.varType = "variable"
+        self.varname = varname
+        self.varlist = []
+        self.varlist.append(varname)
+
+    def append(self,var):
+        # appends all the variables from previous token
+        vlist = var.getList()
+        for v in vlist:
+            self.varlist.append(v)
+    #def getName(self):
+    #    return self.varlist[0]
+    def getList(self):
+        return self.varlist
+
+# Verbs act on the accumulated variable tokens
+class Verb(Variable, Command):
+    def __init__(self, varname, swmrs, bldr):
+        super().__init__(varname)
+        self.varType = "verb"
+        self.varname = varname
+        self.swmrs = swmrs
+        self.bldr = bldr
+        self.limit = None   # set when a limit is fused into a sort
+
+
+# here the Verb is executed
+    def comd(self):
+        self.run(self.swmrs, self.bldr)
+
+    # runs the verb on a list of swimmers, so that a compiled
+    # verb can be run again on another list
+    def run(self, swmrs, bldr):
+        args = self.varlist[1:]     # skip the verb itself
+        # Sort by all the fields at once
+        if self.varname.lower() == "sortby":
+            sorter = Sorter(swmrs)
+            sorter.sortby(*self.getKeys(), limit=self.limit)
+
+        # top N by fields selects the first N without a full sort
+        if self.varname.lower() == "top":
+            Sorter(swmrs).sortby(*self.getKeys(), limit=self.getLimit())
+
+        # keep only the first N swimmers
+        if self.varname.lower() == "limit":
+            del swmrs[self.getCount(args):]
+
+        # count, avg, min or max, optionally by a group field
+        if self.varname.lower() in Aggregator.functions:
+            fields = [v.lower() for v in args]
+            group = None
+            if "by" in fields:
+                group = fields[fields.index("by") + 1]
+                fields = fields[:fields.index("by")]
+            field = fields[0] if fields else None
+            if field is None and self.varname.lower() != "count":
+                raise ValueError(self.varname + " needs a field")
+            aggr = Aggregator(swmrs)
+            bldr.setPlist(aggr.create(self.varname.lower(), field, group))
+
+        # keep only the swimmers that match
+        if self.varname.lower() == "where":
+            Filter(swmrs).where(args)
+
+        # generate a List of lines to disolay
+        if self.varname.lower() == "print":
+            pres = Printres(args, bldr)
+            plist = pres.create(swmrs)
+
+    # the fields a sortby or top verb sorts on
+    # thenby just adds more keys to the same sort
+    def getKeys(self):
+        args = self.varlist[1:]
+        if self.varname.lower() == "top":
+            args = args[1:]     # skip the count
+        return [v.lower() for v in args if v.lower() not in ("by", "thenby")]
+
+    # the most swimmers this verb can leave, or None
+    def getLimit(self):
+        if self.varname.lower() in ("top", "limit"):
+            count = self.getCount(self.varlist[1:])
+            if self.limit is not None:
+                count = min(count, self.limit)
+            return count
+        return self.limit
+
+    # the count given to top or limit
+    def getCount(self, args):
+        if len(args) == 0 or not args[0].isdigit():
+            raise ValueError(self.varname + " needs a number")
+        return int(args[0])
+
+# creates the results strings to be loaded into the list box
+# the lines are produced lazily, one row at a time
+class Printres:
+    def __init__(self, varlist, bldr):
+        self.varlist = [v.lower() for v in varlist]
+        self.bldr = bldr
+
+        #create one function to fetch all the fields from a Swimmer
+        self.fields = attrgetter(*self.varlist) if self.varlist else None
+
+    def create(self, swmrs):
+         self.bldr.setPlist(self.rows(swmrs))
+
+    # generator returning one formatted line per swimmer
+    def rows(self, swmrs):
+        if self.fields is None:
+            return
+        swmrs = list(swmrs)     # later verbs may reorder the list
+        fmt = self.template(swmrs).format
+        if len(self.varlist) == 1:
+            for sw in swmrs:
+                yield fmt(self.fields(sw))
+        else:
+            for sw in swmrs:
+                yield fmt(*self.fields(sw))
+
+    # format string with each column padded to the width
+    # of its widest value in any of the rosters the rows
+    # come from, since a folder query merges several files
+    def template(self, swmrs):
+        rosters = {}
+        for sw in swmrs:
+            roster = getattr(sw, "roster", None)
+            if roster is not None:
+                rosters[id(roster)] = roster
+        cols = []
+        for i, v in enumerate(self.varlist):
+            width = max((r.fieldWidth(v) for r in rosters.values()),
+                        default=0)
+            cols.append("{" + str(i) + "!s:<" + str(width) + "}")
+        return "   ".join(cols) + "   "
+
+    # writes all the lines to a file-like sink
+    def write(self, swmrs, sink):
+        writeRows(self.rows(swmrs), sink)
+
+
+# writes lines to a sink in chunks rather than one by one
+def writeRows(rows, sink, chunk=1000):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk:
+            batch.append("")
+            sink.write("\n".join(batch))
+            batch = []
+    if batch:
+        batch.append("")
+        sink.write("\n".join(batch))
+
+
+# Parser takes tokens and assigns them
+# to Variable and Verb objects
+class Parser():
+    verbs= {"print", "sortby", "where", "top", "limit",
+            "count", "avg", "min", "max"}
+    variables = {"lname", "frname", "club", "time", "age"}
+    keywords = {"thenby", "and", "by"}     # reduced like variables
+    # verbs followed by comparisons, values or counts
+    clauses = {"where", "top", "limit"}
+    # order verbs run in once compiled: filters first,
+    # then sorts, then limits, then printing
+    stages = {"where": 0, "sortby": 1, "top": 1, "limit": 2}
+    # comparison operators are tokens even without spaces around them
+    tokenPattern = re.compile(r"[<>!=]=?|[^\s<>!=]+")
+
+    def __init__(self, commands, swmrs, bldr):
+        tokens = Parser.tokenize(commands)
+        self.stack = []     #initialize stack
+        self.swmrs = swmrs  # save swimmer array
+        self.bldr = bldr    # and UI
+        literals = False    # inside a where clause
+        # go thru tokens and make them into
+        # variables or verbs
+        for tok, value in zip(tokens, Parser.valueFlags(tokens)):
+            if value:       # compared with, so never a verb or variable
+                self.stack.append(Variable(tok))
+            elif tok.lower() in Parser.verbs:     # it's a Verb
+                self.stack.append(Verb(tok, self.swmrs, self.bldr))
+                literals = tok.lower() in Parser.clauses
+            elif tok.lower() in Parser.variables: #or a Variable
+                self.stack.append(Variable(tok))
+            elif tok.lower() in Parser.keywords:  #or a keyword
+                self.stack.append(Variable(tok))
+            elif literals:  # comparisons and values
+                self.stack.append(Variable(tok))
+
+    # splits a command into tokens
+    @staticmethod
+    def tokenize(commands):
+        return Parser.tokenPattern.findall(commands)
+
+    # true for each token that follows a comparison, which is
+    # a literal value even if it spells a verb or variable
+    @staticmethod
+    def valueFlags(tokens):
+        flags = []
+        afterComparison = False
+        for tok in tokens:
+            flags.append(afterComparison)
+            afterComparison = not afterComparison and tok in COMPARISONS
+        return flags
+
+    # stack reduction takes variables and collapses them
+    # into a verb and its arguments
+    def reduceStack(self):
+        verb = self.reduce()
+        # act on variables if this is a verb
+        if verb is not None:
+            verb.comd()
+
+    # reduces the top of the stack and returns
+    # the verb if it now has all its arguments
+    def reduce(self):
+        var = self.stack.pop()
+
+        if var.varType == "variable":
+           nextVar = self.stack.pop()   #get top of stack
+           nextVar.append(var)      # append variables
+           self.stack.append(nextVar)   #and put it back
+           if nextVar.varType == "verb":
+                return nextVar
+        # count is a verb even without any variables
+        elif var.varType == "verb" and len(var.varlist) == 1 \
+                and var.varname.lower() == "count":
+            return var
+        return None
+
+    # reduces the whole stack without running anything
+    # and returns the verbs in the order they would run
+    def compile(self):
+        verbs = []
+        while len(self.stack) > 0:
+            verb = self.reduce()
+            if verb is not None:
+                verbs.append(verb)
+        # predicate pushdown: filters run before any sort or print
+        # and a limit runs after the sorts
+        verbs.sort(key=lambda verb: Parser.stages.get(verb.varname.lower(), 3))
+        # a limit right after a sort turns it into a top-k selection
+        for before, verb in zip(verbs, verbs[1:]):
+            if (verb.varname.lower() == "limit"
+                    and before.varname.lower() in ("sortby", "top")):
+                before.limit = verb.getCount(verb.varlist[1:])
+        return Plan(verbs)
+
+    def getStack(self):
+         return self.stack
+
+# A compiled command: the verbs in execution order
+class Plan():
+    def __init__(self, verbs):
+        self.verbs = verbs
+
+    def execute(self, swmrs, bldr):
+        for verb in self.verbs:
+            verb.run(swmrs, bldr)
+
+    # the verbs that select and order swimmers, which can run
+    # on each file separately, and the verbs that produce output
+    def split(self):
+        select = [verb for verb in self.verbs
+                  if Parser.stages.get(verb.varname.lower(), 3) < 3]
+        output = [verb for verb in self.verbs
+                  if Parser.stages.get(verb.varname.lower(), 3) >= 3]
+        return select, output
+
+    # the fields of the last sort, or an empty List
+    def getKeys(self):
+        keys = []
+        for verb in self.verbs:
+            if verb.varname.lower() in ("sortby", "top"):
+                keys = verb.getKeys()
+        return keys
+
+    # the most swimmers the plan can return, or None
+    def getLimit(self):
+        limits = [verb.getLimit() for verb in self.verbs]
+        limits = [count for count in limits if count is not None]
+        return min(limits) if limits else None
+
+# keeps the most recently used compiled commands
+class PlanCache():
+    def __init__(self, size=128):
+        self.size = size
+        self.plans = OrderedDict()
+
+    # commands differing only in the case of their verbs and
+    # variables, or in spacing, share a plan
+    # values in where clauses keep their case
+    def normalize(self, commands):
+        words = Parser.verbs | Parser.variables | Parser.keywords
+        tokens = []
+        found = Parser.tokenize(commands)
+        for tok, value in zip(found, Parser.valueFlags(found)):
+            tokens.append(tok.lower() if tok.lower() in words and not value
+                          else tok)
+        return " ".join(tokens)
+
+    # returns the compiled plan, parsing the command only once
+    def getPlan(self, commands):
+        key = self.normalize(commands)
+        plan = self.plans.get(key)
+        if plan is not None:
+            self.plans.move_to_end(key)
+        else:
+            plan = Parser(key, None, None).compile()
+            self.plans[key] = plan
+            if len(self.plans) > self.size:
+                self.plans.popitem(last=False)  # drop least recent
+        return plan
+
+# the swimmer file, read once and again only when it changes
+class Dataset():
+    def __init__(self, filename):
+        self.filename = filename
+        self.stamp = None
+        self.roster = None
+
+    def getRoster(self):
+        stamp = self.getStamp()
+        if stamp != self.stamp:
+            self.setRoster(loadRoster(self.filename), stamp)
+        return self.roster
+
+    # the modification time and size of the file on disk
+    def getStamp(self):
+        st = os.stat(self.filename)
+        return (st.st_mtime_ns, st.st_size)
+
+    # true if the file changed since it was read
+    def isStale(self):
+        return self.getStamp() != self.stamp
+
+    # keeps a roster read elsewhere, such as in a worker process
+    def setRoster(self, roster, stamp):
+        self.roster = roster
+        self.stamp = stamp
+
+    # a fresh list in file order, since the verbs sort it in place
+    def getSwimmers(self):
+        return self.getRoster().getSwimmers()
+
+    # all the rows as row numbers, with no Swimmer views made
+    def getRows(self):
+        return RowSet(self.getRoster())
+
+
+# reads one event file and sorts it, run inside a worker process
+# the sort order is cached in the roster and travels back with it
+def loadSorted(filename, keys):
+    roster = Roster.read(filename)
+    if keys:
+        roster.sortIndex(keys)
+    return roster
+
+
+# A Dataset for every event file in a folder
+# Queries run on each file separately and the sorted results
+# are combined lazily with a k-way merge, so the union of
+# all the files is never held in one List
+class EventFolder():
+    def __init__(self, folder, workers=None):
+        self.folder = folder
+        # None uses one worker per core, 1 reads in this process
+        self.workers = workers or os.cpu_count() or 1
+        self.datasets = {}      # file name -> Dataset
+
+    # the event files in the folder, in name order
+    def getFilenames(self):
+        return sorted(os.path.join(self.folder, name)
+                      for name in os.listdir(self.folder)
+                      if name.endswith(".txt"))
+
+    # the roster of every file, rereading only the files that
+    # changed, in parallel, and already sorted on keys
+    def getRosters(self, keys=()):
+        filenames = self.getFilenames()
+        datasets = [self.datasets.get(f) or Dataset(f) for f in filenames]
+        self.datasets = dict(zip(filenames, datasets))
+        stale = [ds for ds in datasets if ds.isStale()]
+        stamps = [ds.getStamp() for ds in stale]
+        names = [ds.filename for ds in stale]
+        keys = tuple(keys)
+        if self.workers <= 1 or len(stale) <= 1:
+            rosters = list(map(loadSorted, names, repeat(keys)))
+        else:
+            workers = min(self.workers, len(stale))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                rosters = list(pool.map(loadSorted, names, repeat(keys)))
+        for ds, roster, stamp in zip(stale, rosters, stamps):
+            ds.setRoster(roster, stamp)
+        return [ds.roster for ds in datasets]
+
+    # runs a compiled command over all the files
+    def execute(self, plan, bldr):
+        select, output = plan.split()
+        keys = plan.getKeys()
+        streams = []
+        for roster in self.getRosters(keys):
+            swmrs = RowSet(roster)
+            for verb in select:
+                verb.run(swmrs, bldr)
+            streams.append(swmrs)
+        # each file is in order, so merging keeps the order
+        if keys:
+            merged = heapq.merge(*streams, key=attrgetter(*keys))
+        else:
+            merged = chain.from_iterable(streams)
+        count = plan.getLimit()
+        if count is not None:
+            merged = islice(merged, count)
+        if len(output) > 1:
+            merged = list(merged)   # several verbs read the same rows
+        for verb in output:
+            verb.run(merged, bldr)
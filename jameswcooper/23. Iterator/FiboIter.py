@@ -1,4 +1,8 @@
-"""Creates Iterator for Fibonacci series"""
+"""Creates Iterator for Fibonacci series
+The position can be saved with state() and resumed with restore()
+and seek() moves to any term of the series"""
+
+from fibofast import seekState
 
 class FiboIter():
     def __init__(self):
@@ -21,6 +25,27 @@ class FiboIter():
         else:
             raise StopIteration
 
+    # the last two values, enough to carry on from here
+    def state(self):
+        return (self.current, self.prev)
+
+    # carries on from a saved state
+    def restore(self, state):
+        self.current, self.prev = state
+
+    # the next value returned will be F(n)
+    def seek(self, n):
+        self.restore(seekState(n))
+
+    # returns up to n values, an empty List at the end
+    def next_batch(self, n):
+        batch = []
+        for val in self:
+            batch.append(val)
+            if len(batch) >= n:
+                break
+        return batch
+
 
 class Starter():
     def start(self):
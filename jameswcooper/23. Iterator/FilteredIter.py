@@ -1,6 +1,10 @@
 """Filtered iterator used to return members of a single
 swim club. The list of clubs is created by adding club names to a set
-and then sorting the list"""
+and then sorting the list.
+Given a Roster, the iterator reads the club's rows from the
+roster's inverted index instead of scanning every swimmer.
+state() and restore() save and resume the position, and
+next_batch() returns several names at a time"""
 
 import tkinter as tk
 from operator import attrgetter
@@ -9,83 +13,51 @@ import tkinter.ttk
 from tkinter.ttk import *
 import os, sys
 
-
-# One swimmer consists of name, club and time
-class Swimmer():
-    def __init__(self, dataline):
-        sarray = dataline.split()  # read in a row and separate the columns
-        i = 1  # skip the numbered column
-        self.frname = sarray[1]  # names
-        self.lname = sarray[2]
-        self.age = int(sarray[3])  # age
-        self.club = sarray[4]  # club symbol
-        self.seedtime = sarray[5]  # seed time as string
-        self.time = 0.0  # set defaults
-
-        # remove colon from times of 1 minute or greater
-        # so they can be sorted numerically
-        if self.seedtime.find(":") > 0:
-            mins = self.seedtime.split(":")
-            atime = mins[0] + mins[1]  # time with colon removed
-            self.time = float(atime)  # converted to float for sorting
-        else:
-            self.time = float(self.seedtime)
-
-    def getName(self):
-        return self.frname + " " + self.lname
-
-
-# Array of swimmers that is displayed on the left
-class Swimmers():
-    def __init__(self, filename):
-        self.swimmers = []
-
-        # read in the data file for this event
-        f = open(filename, "r")
-        # the Swimmer class parses each line of the data file
-        for swstring in f:
-            sw = Swimmer(swstring)
-            self.swimmers.append(sw)
-        f.close()
-
-        # creates a set of club names
-        # using the set to eliminate duplicates
-        self.clubs = set()
-        for sw in self.swimmers:
-            self.clubs.add(sw.club)
-
-    # gets an array of clubs and sorts it
-    def getClubs(self):
-        clubnames = []
-        for c in self.clubs:
-            clubnames.append(c)
-        clubnames.sort(reverse=False)
-        return clubnames
-
-    # returns an array of Swimmers
-    def getSwimmers(self):
-        return self.swimmers
+# the columnar swimmer roster is shared by all the swim examples
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, "SwimCommon"))
+from SwimRoster import Roster, Swimmers
 
 
 # Filtered iterator returns only members of one club
+# optionally only those from minAge to maxAge
 class SwmrIter():
-    def __init__(self, club, swmrs):
+    def __init__(self, club, swmrs, minAge=None, maxAge=None):
         self.club = club
         self.swmrs = swmrs
+        self.minAge = minAge
+        self.maxAge = maxAge
+        self.reset()
 
+    # returns self unchanged, so a restored iterator carries on
+    # from its saved position; call reset() to start again
     def __iter__(self):
-        self.index = 0
         return self
 
+    # goes back to the first club member
+    def reset(self):
+        self.index = 0
+        self.rows = None
+        if isinstance(self.swmrs, Roster):
+            # only the matching rows are ever visited
+            self.rows = self.swmrs.clubRows(self.club,
+                                            self.minAge, self.maxAge)
+
     # Next operation returns next swimmer in list
     # that is a club member
     # Terminated with StopIteration when the index
     # pass the end of the list
     def __next__(self):
+        if self.rows is not None:
+            if self.index >= len(self.rows):
+                raise StopIteration
+            swm = self.swmrs.row(self.rows[self.index])
+            self.index += 1
+            return swm.getName()
         found = False
         while not found and self.index < len(self.swmrs):
             swm = self.swmrs[self.index]
-            if swm.club == self.club:
+            if swm.club == self.club and self.inAges(swm.age):
                 found = True
                 self.index += 1
                 return swm.getName()
@@ -94,6 +66,39 @@ class SwmrIter():
                 found = False
         raise StopIteration
 
+    # the position of the iterator, which can be saved
+    # and later given to restore to carry on from there
+    def state(self):
+        return {"club": self.club, "minAge": self.minAge,
+                "maxAge": self.maxAge, "index": self.index}
+
+    # carries on from a saved state
+    def restore(self, state):
+        if (state["club"], state["minAge"], state["maxAge"]) != \
+                (self.club, self.minAge, self.maxAge):
+            raise ValueError("state is from a different filter")
+        self.reset()
+        self.index = state["index"]
+
+    # returns up to n names, an empty List at the end
+    def next_batch(self, n):
+        if self.rows is not None:
+            rows = self.rows[self.index:self.index + n]
+            self.index += len(rows)
+            return [self.swmrs.row(row).getName() for row in rows]
+        batch = []
+        while len(batch) < n:
+            try:
+                batch.append(next(self))
+            except StopIteration:
+                break
+        return batch
+
+    # true if an age is within the age range
+    def inAges(self, age):
+        return (self.minAge is None or age >= self.minAge) and \
+               (self.maxAge is None or age <= self.maxAge)
+
 
 # builds the UI, reads in the swimmer data
 class Builder():
@@ -123,7 +128,7 @@ class Builder():
         self.sublist.delete(0, END)
         club = self.combo.get()
         print(club)
-        switer = SwmrIter(club, self.swmrs.getSwimmers())
+        switer = SwmrIter(club, self.swmrs.getRoster())
         for val in switer:
             self.sublist.insert(END, val)
 
@@ -1,11 +1,15 @@
 from dataclasses import dataclass
 
+from fibofast import seekState
+
 @dataclass
 class Fibo():
     max:int
 
-    def fibo(self):
-        current, prev = 0, 1    #initialize
+    # state is the last value and the one before it,
+    # so a series can be resumed where it stopped
+    def fibo(self, state=(0, 1)):
+        current, prev = state    #initialize
 
         while current < self.max:  # but stops at max
             secondLast, prev = prev, current
@@ -16,3 +20,7 @@ class Fibo():
 fb = Fibo(100).fibo()
 for f in fb:
     print(f)
+
+# seekState(n) starts the series at F(n)
+for f in Fibo(1000).fibo(seekState(10)):
+    print(f)
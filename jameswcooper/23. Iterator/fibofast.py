@@ -0,0 +1,112 @@
+"""Fast Fibonacci numbers for the Fibonacci iterators
+fib(n) uses fast doubling, so F(n) for a huge n takes about
+log2(n) big integer multiplications instead of n additions:
+    F(2k)   = F(k) * (2*F(k+1) - F(k))
+    F(2k+1) = F(k)**2 + F(k+1)**2
+fibRange(a, b) generates F(a) ... F(b-1) in chunks, and seekState(n)
+gives the state that makes FiboIter, fibo() or Fibo.fibo()
+start at F(n). Pairs already computed are kept in a memo
+shared by all threads."""
+
+from collections import OrderedDict
+import threading
+
+
+# most recently used (F(n), F(n+1)) pairs, shared by all threads
+# both the number of pairs and their total size are limited,
+# since a pair for a huge n takes megabytes
+class FiboMemo():
+    def __init__(self, size=1024, maxBytes=64 * 2**20):
+        self.size = size
+        self.maxBytes = maxBytes
+        self.bytes = 0
+        self.pairs = OrderedDict()     # n -> ((F(n), F(n+1)), bytes)
+        self.lock = threading.Lock()
+
+    def get(self, n):
+        with self.lock:
+            entry = self.pairs.get(n)
+            if entry is None:
+                return None
+            self.pairs.move_to_end(n)
+            return entry[0]
+
+    # pairs bigger than a quarter of the budget are not kept
+    def put(self, n, pair):
+        size = (pair[0].bit_length() + pair[1].bit_length()) // 8
+        if size > self.maxBytes // 4:
+            return
+        with self.lock:
+            old = self.pairs.pop(n, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.pairs[n] = (pair, size)
+            self.bytes += size
+            while len(self.pairs) > self.size or self.bytes > self.maxBytes:
+                self.bytes -= self.pairs.popitem(last=False)[1][1]
+
+
+memo = FiboMemo()
+
+
+# returns (F(n), F(n+1)) by fast doubling
+def fibPair(n):
+    if n < 0:
+        raise ValueError("n must not be negative")
+    pair = memo.get(n)
+    if pair is not None:
+        return pair
+    a, b = 0, 1     # F(0), F(1)
+    # walk the bits of n from the top, doubling at each bit
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a)     # F(2k)
+        d = a * a + b * b       # F(2k+1)
+        if bit == "1":
+            a, b = d, c + d
+        else:
+            a, b = c, d
+    memo.put(n, (a, b))
+    return a, b
+
+
+# returns F(n), with F(0) = 0 and F(1) = 1
+def fib(n):
+    return fibPair(n)[0]
+
+
+# generates Lists of F(a) up to F(b-1), chunk values at a time
+# only the first value needs fast doubling, the rest are additions
+def fibRange(a, b, chunk=1024):
+    if a >= b:
+        return
+    current, following = fibPair(a)
+    for start in range(a, b, chunk):
+        batch = []
+        for i in range(min(chunk, b - start)):
+            batch.append(current)
+            current, following = following, current + following
+        yield batch
+
+
+# the (current, prev) state after which the iterators return F(n)
+# the iterators start at F(1), so state (0, 1) is the beginning
+def seekState(n):
+    if n < 1:
+        raise ValueError("the series starts at F(1)")
+    if n == 1:
+        return (0, 1)
+    prev, current = fibPair(n - 2)
+    return (current, prev)
+
+
+#----------------------------
+def main():
+    print(fib(100))
+    print(fib(1000000).bit_length(), "bits in F(1000000)")
+    for batch in fibRange(10, 20, 4):
+        print(batch)
+
+
+###  Here we go  ####
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
-""" Fibonacci iterator using a generator """
+""" Fibonacci iterator using a generator
+A generator can be resumed by starting a new one
+from the last two values it returned, or started at
+any term with state=seekState(n)"""
 
-def fibo(max=0):
-    current, prev = 0, 1    # initialize variables
+from fibofast import seekState
+
+# state is the last value and the one before it
+def fibo(max=0, state=(0, 1)):
+    current, prev = state   # initialize variables
 
     while current < max:   #but stops at max
         secondLast, prev = prev, current
@@ -12,3 +18,6 @@ def fibo(max=0):
 fb = fibo(100)
 for f in fb:
     print(f, end=', ')
+print()
+for f in fibo(1000, seekState(10)):   # starts at F(10)
+    print(f, end=', ')
@@ -8,6 +8,12 @@ from operator import attrgetter
 from tkinter import *
 #import tkinter.ttk
 #from tkinter.ttk import *
+import os, sys
+
+# the columnar swimmer roster is shared by all the swim examples
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, "SwimCommon"))
+from SwimRoster import Swimmers
 
 # Command interface
 class Command():
@@ -97,48 +103,6 @@ class ClearButton(DButton):
     def comd(self):
         self.med.clearClick()
 
-# One swimmer consists of name, club and time
-class Swimmer():
-    def __init__(self, dataline):
-        sarray = dataline.split()  # read in a row and separate the columns
-        i = 1  # skip the numbered column
-        self.frname = sarray[1]  # names
-        self.lname = sarray[2]
-        self.age = int(sarray[3])  # age
-        self.club = sarray[4]  # club symbol
-        self.seedtime = sarray[5]  # seed time as string
-        self.time = 0.0  # set defaults
-
-        # remove colon from times of 1 minute or greater
-        # so they can be sorted numerically
-        if self.seedtime.find(":") > 0:
-            mins = self.seedtime.split(":")
-            atime = mins[0] + mins[1]  # time with colon removed
-            self.time = float(atime)  # converted to float for sorting
-        else:
-            self.time = float(self.seedtime)
-
-    def getName(self):
-        return self.frname + " " + self.lname
-
-
-# Array of swimmers that is displayed on the left
-class Swimmers():
-    def __init__(self, filename):
-        self.swimmers = []
-
-        # read in the data file for this event
-        f = open(filename, "r")
-        # the Swimmer class parses each line of the data file
-        for swstring in f:
-            sw = Swimmer(swstring)
-            self.swimmers.append(sw)
-        f.close()
-
-    # returns an array of Swimmers
-    def getSwimmers(self):
-        return self.swimmers
-
 # builds the UI, reads in the swimmer data
 class Builder():
     def build(self):
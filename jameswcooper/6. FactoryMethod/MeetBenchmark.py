@@ -0,0 +1,81 @@
+"""Times Meet.seed() for a meet of many events with 1, 2, 4 ...
+worker processes up to the number of cores, to show how
+seeding a full meet scales.
+The event files are made by repeating the entries of 100free.txt
+with shifted seed times, and are deleted afterwards."""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from SwimMeet import Meet
+from SwimRoster import fromCentis, toCentis
+
+
+# writes one event file of count entries based on the sample lines
+def writeEvent(filename, sample, count, rand):
+    with open(filename, "w") as f:
+        for i in range(count):
+            frname, lname, age, club, seedtime = sample[i % len(sample)]
+            centis = toCentis(seedtime) + rand.randrange(0, 1000)
+            f.write(f"{i + 1} {frname} {lname} {age} {club} "
+                    f"{fromCentis(centis)}\n")
+
+
+# creates the meet, alternating timed finals and prelims
+def makeMeet(folder, sample, events, entries, workers):
+    rand = random.Random(events * entries)     # same files every run
+    meet = Meet(workers)
+    for e in range(events):
+        filename = os.path.join(folder, f"event{e}.txt")
+        writeEvent(filename, sample, entries, rand)
+        if e % 2 == 0:
+            meet.addTimedFinal(filename, 8)
+        else:
+            meet.addPrelim(filename, 8)
+    return meet
+
+
+# worker counts 1, 2, 4 ... up to the number of cores
+def workerCounts():
+    cores = os.cpu_count() or 1
+    counts = []
+    n = 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=5000)
+    args = parser.parse_args()
+
+    sample = []
+    with open(os.path.join(sys.path[0], "100free.txt")) as f:
+        for line in f:
+            sample.append(line.split()[1:6])
+
+    with tempfile.TemporaryDirectory() as folder:
+        meet = makeMeet(folder, sample, args.events, args.entries, 1)
+        print(f"{args.events} events of {args.entries} entries")
+        base = None
+        for workers in workerCounts():
+            meet.workers = workers
+            start = time.perf_counter()
+            meet.seed()
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            print(f"{workers:3} workers {elapsed:8.3f} s"
+                  f"  speedup {base / elapsed:5.2f}")
+
+
+###  Here we go  ####
+if __name__ == "__main__":
+    main()
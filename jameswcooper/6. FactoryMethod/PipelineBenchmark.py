@@ -0,0 +1,166 @@
+"""Times the swim pipeline without starting Tk:
+parse the entry file, sort it, seed it and render the rows
+the way SwimFactoryConsole prints them, for several roster sizes.
+Each stage reports its wall time, the memory allocated and the
+peak allocation seen by tracemalloc, and the peak RSS of the
+process. With --json the results are also written as JSON,
+so that runs can be compared over time.
+The entry files are made by DataGen and deleted afterwards."""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource     # not available on Windows
+except ImportError:
+    resource = None
+
+from SwimClasses import PrelimEvent, TimedFinalEvent
+from DataGen import generate
+
+EVENTS = {"prelim": PrelimEvent, "final": TimedFinalEvent}
+
+
+# peak resident set size of this process in bytes, or None
+def peakRss():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+# the stages of the pipeline, each using the result of the last
+class Pipeline():
+    stages = ["parse", "sort", "seed", "render"]
+
+    def __init__(self, eventClass, filename, lanes):
+        self.eventClass = eventClass
+        self.filename = filename
+        self.lanes = lanes
+
+    def parse(self, _):
+        return self.eventClass(self.filename, self.lanes)
+
+    # the roster caches the order by time, which seeding reuses
+    def sort(self, event):
+        event.roster.sortIndex(("time",))
+        return event
+
+    def seed(self, event):
+        return event.getSeeding().getSwimmers()
+
+    def render(self, swmrs):
+        with open(os.devnull, "w") as sink:
+            for sw in swmrs:
+                sink.write(f'{sw.heat:3}{sw.lane:3} {sw.getName():20}'
+                           f'{sw.age:3} {sw.seedtime:9}\n')
+        return len(swmrs)
+
+    # runs every stage, calling measure(stage, function, value)
+    def run(self, measure):
+        value = None
+        for stage in self.stages:
+            value = measure(stage, getattr(self, stage), value)
+
+
+# wall time of each stage, without tracemalloc slowing it down
+def timeStages(pipeline):
+    results = {}
+
+    def measure(stage, func, value):
+        start = time.perf_counter()
+        value = func(value)
+        results[stage] = {"seconds": time.perf_counter() - start,
+                          "peakRss": peakRss()}
+        return value
+
+    pipeline.run(measure)
+    return results
+
+
+# bytes allocated and peak bytes of each stage
+def traceStages(pipeline):
+    results = {}
+
+    def measure(stage, func, value):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        value = func(value)
+        current, peak = tracemalloc.get_traced_memory()
+        results[stage] = {"allocated": current - before,
+                          "peakAllocated": peak - before}
+        return value
+
+    tracemalloc.start()
+    try:
+        pipeline.run(measure)
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+# runs the pipeline on one generated roster size
+def benchmark(folder, rows, event, lanes, seed, trace):
+    filename = generate("100free", rows, seed,
+                        os.path.join(folder, f"entries{rows}.txt"))
+    pipeline = Pipeline(EVENTS[event], filename, lanes)
+    stages = timeStages(pipeline)
+    if trace:
+        for stage, result in traceStages(pipeline).items():
+            stages[stage].update(result)
+    os.remove(filename)
+    return {"rows": rows, "event": event, "lanes": lanes,
+            "stages": [dict(stage=s, **stages[s]) for s in Pipeline.stages]}
+
+
+# one line per stage for the console
+def report(run):
+    print(f"{run['rows']} entries, {run['event']}, {run['lanes']} lanes")
+    for st in run["stages"]:
+        line = f"  {st['stage']:7}{st['seconds']:9.3f} s"
+        if "allocated" in st:
+            line += (f"{st['allocated'] / 2**20:10.1f} MB alloc"
+                     f"{st['peakAllocated'] / 2**20:10.1f} MB peak")
+        if st["peakRss"] is not None:
+            line += f"{st['peakRss'] / 2**20:10.1f} MB rss"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 10000, 100000])
+    parser.add_argument("--event", choices=sorted(EVENTS), default="prelim")
+    parser.add_argument("--lanes", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-trace", dest="trace", action="store_false",
+                        help="skip the tracemalloc pass")
+    parser.add_argument("--json", help="file to write the results to")
+    args = parser.parse_args()
+
+    runs = []
+    with tempfile.TemporaryDirectory() as folder:
+        for rows in args.sizes:
+            run = benchmark(folder, rows, args.event, args.lanes,
+                            args.seed, args.trace)
+            report(run)
+            runs.append(run)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "platform": platform.platform(),
+                       "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "seed": args.seed,
+                       "runs": runs}, f, indent=2)
+
+
+###  Here we go  ####
+if __name__ == "__main__":
+    main()
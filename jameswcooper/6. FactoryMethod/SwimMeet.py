@@ -0,0 +1,61 @@
+"""A Meet holds all the events of a swim meet and seeds them together.
+Each event is read and seeded in a worker process, so a meet with
+hundreds of events uses every core. The results always come back
+in the order the events were added, whatever the number of workers."""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from SwimClasses import TimedFinalEvent, PrelimEvent
+
+
+# reads and seeds one event, run inside a worker process
+# returns the roster with its heat and lane columns filled in
+def seedEvent(eventClass, filename, lanes):
+    event = eventClass(filename, lanes)
+    event.getSeeding()      # seeding writes heats and lanes to the roster
+    return event.roster
+
+
+class Meet():
+    def __init__(self, workers=None):
+        # None uses one worker per core, 1 seeds in this process
+        self.workers = workers or os.cpu_count() or 1
+        self.events = []    # (event class, file name, lanes)
+
+    # adds an event to be seeded
+    def addEvent(self, eventClass, filename, lanes):
+        self.events.append((eventClass, filename, lanes))
+
+    def addTimedFinal(self, filename, lanes):
+        self.addEvent(TimedFinalEvent, filename, lanes)
+
+    def addPrelim(self, filename, lanes):
+        self.addEvent(PrelimEvent, filename, lanes)
+
+    def __len__(self):
+        return len(self.events)
+
+    # seeds every event and returns a List of seeded rosters
+    # in event order
+    def seed(self):
+        classes, filenames, lanes = self.columns()
+        if self.workers <= 1 or len(self.events) <= 1:
+            return list(map(seedEvent, classes, filenames, lanes))
+        workers = min(self.workers, len(self.events))
+        # several events per task keeps the pickling overhead down
+        chunk = max(1, len(self.events) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(seedEvent, classes, filenames, lanes,
+                                 chunksize=chunk))
+
+    # returns the seeded swimmers of every event, in event order
+    def getSwimmers(self):
+        return [roster.getSwimmers() for roster in self.seed()]
+
+    # splits the event list into columns for map
+    def columns(self):
+        if not self.events:
+            return [], [], []
+        classes, filenames, lanes = zip(*self.events)
+        return classes, filenames, lanes
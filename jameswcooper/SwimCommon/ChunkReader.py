@@ -0,0 +1,60 @@
+"""Parallel reader for very large entry files.
+The file is memory mapped and cut into chunks that end on a newline.
+Each worker process maps the file again and parses only its own
+chunk into a small Roster, so the raw text is never passed between
+processes or held whole in memory. The chunk rosters come back in
+file order and are joined column by column with Roster.extend."""
+
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
+
+from SwimRoster import Roster
+
+
+# (start, end) byte ranges of about chunkSize bytes,
+# each ending just after a newline
+def chunkBounds(filename, chunkSize):
+    size = os.path.getsize(filename)
+    if size == 0:
+        return []
+    bounds = []
+    with open(filename, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = mm.find(b"\n", min(start + chunkSize, size) - 1)
+            end = size if end < 0 else end + 1
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+# parses the lines between start and end, run inside a worker process
+def parseChunk(filename, start, end):
+    roster = Roster()
+    with open(filename, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        roster.addLines(mm[start:end].decode().splitlines())
+    return roster
+
+
+# reads an entry file with one worker per core
+# None uses one worker per core, 1 reads in this process
+def readChunked(filename, workers=None, chunkSize=1 << 24):
+    workers = workers or os.cpu_count() or 1
+    bounds = chunkBounds(filename, chunkSize)
+    roster = Roster()
+    if not bounds:
+        return roster
+    starts, ends = zip(*bounds)
+    names = [filename] * len(bounds)
+    if workers <= 1 or len(bounds) <= 1:
+        for part in map(parseChunk, names, starts, ends):
+            roster.extend(part)
+        return roster
+    with ProcessPoolExecutor(max_workers=min(workers, len(bounds))) as pool:
+        # results arrive in file order, and each is joined as it comes
+        for part in pool.map(parseChunk, names, starts, ends):
+            roster.extend(part)
+    return roster
@@ -0,0 +1,184 @@
+"""Synthetic data files for load testing the examples.
+Each generator writes a file in the same format as one of the
+small bundled files, at any number of rows, for example
+    python DataGen.py 100free --rows 1000000 --out big100free.txt
+The rows are made by a random.Random seeded with --seed, so the
+same arguments always give the same file, and they are written
+as they are made, so even 10**8 rows need very little memory."""
+
+import argparse
+import json
+from itertools import islice
+import math
+import os
+import random
+import sqlite3
+from xml.sax.saxutils import escape
+
+from SwimRoster import fromCentis
+
+FIRSTNAMES = ["Kelly", "Torey", "Lindsay", "Jen", "Annie", "Kyla", "Kaki",
+              "Margaret", "Kalei", "Teresa", "Ashley", "Amanda", "Samantha",
+              "Katie", "Emily", "Alesha", "Liz", "Michelle", "Kaitlin",
+              "Luke", "Stephen", "Jeffrey", "Ernest", "David", "Ryan",
+              "Matthew", "Christopher", "Charles"]
+LASTNAMES = ["Harrigan", "Thelin", "McKenna", "Pittman", "Goldstein",
+             "Burruss", "Dudley", "Woodward", "Ramsey", "Walker", "Rosetti",
+             "McLellan", "McCarthy", "Kelly", "Brandstetter", "Slater",
+             "Amendola", "Kruger", "Bohdan", "Ducharme", "Moughty",
+             "Mester", "Cosme", "Sudbury", "Verrico", "Liebovitz"]
+CLUBS = ["NES", "PSDY", "HAC", "NCY", "OSS", "WYW", "MBM", "PCSC", "DELM",
+         "CDEV", "WCA", "GYWD", "BRS", "LEHY", "WAC", "LIAC", "OAK", "RAC",
+         "WRAT", "CAT", "ARAC", "HNHS", "HMST", "NMIL", "FFLY", "SHKS"]
+WORDS = ["Brass", "plated", "widgets", "Furled", "frammis", "Detailed",
+         "rat", "brushes", "Zero-based", "hex", "dumps", "Anterior",
+         "antelope", "collars", "Washable", "softwear", "Steam-driven",
+         "drobbling", "wheels"]
+FOODS = ["Apples", "Oranges", "Hamburger", "Butter", "Milk", "Cola",
+         "Green beans", "Bread", "Eggs", "Cheese", "Rice", "Coffee"]
+STORES = ["Stop and Shop", "Village Market", "Shoprite", "Corner Store"]
+GENRES = ["Drama", "Comedy", "Action", "Horror", "Documentary", None]
+
+
+# writes lines to a file in batches as they are generated
+def writeLines(filename, lines, batch=10000):
+    with open(filename, "w") as f:
+        while True:
+            chunk = list(islice(lines, batch))
+            if not chunk:
+                break
+            f.writelines(chunk)
+
+
+# "1 Kelly Harrigan 14 NES 54.13" lines as in 100free.txt
+def free100Lines(rows, rand):
+    for i in range(rows):
+        centis = 5000 + int(rand.expovariate(1 / 600))
+        yield (f"{i + 1} {rand.choice(FIRSTNAMES)} {rand.choice(LASTNAMES)} "
+               f"{rand.randint(12, 18)} {rand.choice(CLUBS)} "
+               f"{fromCentis(centis)}\n")
+
+
+# "Kristen Frost, 9, CAT, 26.31, F" lines as in Swimmers.txt
+def swimmerLines(rows, rand):
+    for i in range(rows):
+        centis = 2400 + int(rand.expovariate(1 / 300))
+        yield (f"{rand.choice(FIRSTNAMES)} {rand.choice(LASTNAMES)}, "
+               f"{rand.randint(8, 10)}, {rand.choice(CLUBS)}, "
+               f"{fromCentis(centis)}, {rand.choice('FM')}\n")
+
+
+# "Brass plated widgets --1,000,076" lines as in products.txt
+def productLines(rows, rand):
+    for i in range(rows):
+        name = " ".join(rand.sample(WORDS, 3))
+        yield f"{name} --{rand.randint(1, 2000000):,}\n"
+
+
+# "x y" lines for the Strategy plots
+def dataLines(rows, rand):
+    y = 0.0
+    for i in range(rows):
+        y += rand.gauss(0, 1)
+        yield f"{i} {y:.3f}\n"
+
+
+# a JSON list of movies, written one movie at a time
+def movieLines(rows, rand):
+    yield "[\n"
+    for i in range(rows):
+        movie = {"title": f"Movie {i + 1}",
+                 "year": rand.randint(1930, 2020),
+                 "director": f"{rand.choice(FIRSTNAMES)} "
+                             f"{rand.choice(LASTNAMES)}",
+                 "genre": rand.choice(GENRES)}
+        yield json.dumps(movie) + (",\n" if i < rows - 1 else "\n")
+    yield "]\n"
+
+
+# persons in the XML layout the factory method example searches
+def personLines(rows, rand):
+    lastnames = LASTNAMES + ["Liar"]
+    yield "<persons>\n"
+    for i in range(rows):
+        yield ("  <person>\n"
+               f"    <firstName>{escape(rand.choice(FIRSTNAMES))}</firstName>\n"
+               f"    <lastName>{escape(rand.choice(lastnames))}</lastName>\n"
+               f"    <age>{rand.randint(18, 90)}</age>\n"
+               "    <phoneNumbers>\n"
+               f"      <phoneNumber type=\"home\">{rand.randint(200, 999)} "
+               f"{rand.randint(1000000, 9999999)}</phoneNumber>\n"
+               "    </phoneNumbers>\n"
+               "  </person>\n")
+    yield "</persons>\n"
+
+
+# the foods, stores and prices tables of groceries.db
+# rows is the number of prices, foods and stores grow with its root
+def writeGroceries(filename, rows, rand, batch=10000):
+    if os.path.exists(filename):
+        os.remove(filename)
+    numFoods = max(len(FOODS), math.isqrt(rows))
+    numStores = max(len(STORES), math.isqrt(rows) // 10)
+    db = sqlite3.connect(filename)
+    db.execute("CREATE TABLE foods (foodkey INT NOT NULL ,foodname "
+               "VARCHAR(45) NULL ,PRIMARY KEY (foodkey))")
+    db.execute("CREATE TABLE stores (storekey INT NOT NULL ,storename "
+               "VARCHAR(45) NULL ,PRIMARY KEY (storekey))")
+    db.execute("CREATE TABLE prices (pricekey INT NOT NULL ,foodkey INT "
+               "NOT NULL ,storekey INT NOT NULL ,price FLOAT NOT NULL ,"
+               "PRIMARY KEY (pricekey))")
+    foods = ((k + 1, FOODS[k % len(FOODS)] + ("" if k < len(FOODS)
+             else f" {k // len(FOODS)}")) for k in range(numFoods))
+    stores = ((k + 1, STORES[k % len(STORES)] + ("" if k < len(STORES)
+              else f" {k // len(STORES)}")) for k in range(numStores))
+    prices = ((k + 1, rand.randint(1, numFoods), rand.randint(1, numStores),
+               round(rand.uniform(0.2, 5.0), 2)) for k in range(rows))
+    for sql, values in (("insert into foods values (?,?)", foods),
+                        ("insert into stores values (?,?)", stores),
+                        ("insert into prices values (?,?,?,?)", prices)):
+        while True:
+            chunk = list(islice(values, batch))
+            if not chunk:
+                break
+            db.executemany(sql, chunk)
+        db.commit()
+    db.close()
+
+
+# kind -> (line generator, default file name)
+GENERATORS = {"100free": (free100Lines, "100free.txt"),
+              "swimmers": (swimmerLines, "Swimmers.txt"),
+              "products": (productLines, "products.txt"),
+              "data": (dataLines, "data.txt"),
+              "movies": (movieLines, "movies.json"),
+              "person": (personLines, "person.xml"),
+              "groceries": (None, "groceries.db")}
+
+
+# writes one generated file and returns its name
+def generate(kind, rows, seed=0, filename=None):
+    lines, default = GENERATORS[kind]
+    filename = filename or default
+    rand = random.Random(f"{kind}:{seed}")     # same rows every run
+    if lines is None:
+        writeGroceries(filename, rows, rand)
+    else:
+        writeLines(filename, lines(rows, rand))
+    return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=sorted(GENERATORS))
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="file to write, default as bundled")
+    args = parser.parse_args()
+    print(generate(args.kind, args.rows, args.seed, args.out))
+
+
+###  Here we go  ####
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Shared cache of parsed data files.
+Each file is parsed once and kept with the (mtime, size) it had,
+so loading an unchanged file again costs one os.stat.
+When a file has only grown, and the bytes just before the old end
+are still the same, only the new lines are parsed and added to the
+cached object. Any other change parses the whole file again.
+The cached objects are shared, so callers must not change them."""
+
+import os
+import threading
+
+
+# one parsed file and where its parsing stopped
+class CacheEntry():
+    def __init__(self, data, stamp, offset, tail):
+        self.data = data        # the parsed object
+        self.stamp = stamp      # (mtime, size) when last read
+        self.offset = offset    # bytes parsed so far
+        self.tail = tail        # the last bytes parsed, to spot rewrites
+
+
+class FileCache():
+    tailSize = 64       # bytes compared to check a file was only appended
+
+    def __init__(self):
+        self.entries = {}   # (path, factory) -> CacheEntry
+        self.lock = threading.Lock()
+
+    # returns the parsed contents of a file
+    # factory() makes an empty object with an addLines(lines) method
+    def load(self, filename, factory):
+        key = (os.path.abspath(filename), factory)
+        with self.lock:
+            st = os.stat(filename)
+            stamp = (st.st_mtime_ns, st.st_size)
+            entry = self.entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                return entry.data
+            if entry is None or not self.appended(filename, entry, stamp):
+                entry = CacheEntry(factory(), None, 0, b"")
+            self.readFrom(filename, entry)
+            entry.stamp = stamp
+            self.entries[key] = entry
+            return entry.data
+
+    # true if the file only grew since the entry was read
+    def appended(self, filename, entry, stamp):
+        if stamp[1] <= entry.offset:
+            return False
+        if entry.tail and not entry.tail.endswith(b"\n"):
+            return False    # the last line may have been extended
+        with open(filename, "rb") as f:
+            f.seek(entry.offset - len(entry.tail))
+            return f.read(len(entry.tail)) == entry.tail
+
+    # parses the file from where the entry stopped
+    def readFrom(self, filename, entry):
+        with open(filename, "rb") as f:
+            f.seek(entry.offset)
+            data = f.read()
+        if not data:
+            return
+        entry.data.addLines(data.decode().splitlines())
+        entry.offset += len(data)
+        entry.tail = (entry.tail + data)[-self.tailSize:]
+
+    # drops a file from the cache
+    def forget(self, filename):
+        with self.lock:
+            path = os.path.abspath(filename)
+            for key in [k for k in self.entries if k[0] == path]:
+                del self.entries[key]
+
+
+# the cache shared by all the swim examples
+fileCache = FileCache()
@@ -0,0 +1,154 @@
+"""Incremental seeding for deck changes on meet day.
+LiveSeeding keeps the entries of one event in a list sorted by
+(seed time, entry number), maintained with bisect, so a late entry,
+a scratch or a corrected seed time is a single insertion or deletion.
+The heat and lane of any position follow directly from the position
+and the number of entries, exactly as in SeedEngine, so nothing is
+reseeded: each change just reports the heats whose membership changed,
+and only those heats need to be redisplayed or written back."""
+
+from bisect import bisect_left, insort
+
+from SeedEngine import SeedEngine
+
+
+class LiveSeeding():
+    def __init__(self, numLanes, circle=False):
+        self.numLanes = numLanes
+        self.circle = circle
+        self.laneOrder = SeedEngine().laneOrder(numLanes)
+        self.entries = []   # sorted (time, entry) pairs
+        self.times = {}     # entry -> seed time
+
+    # seeds all the swimmers in a roster, entry numbers are row numbers
+    @classmethod
+    def fromRoster(cls, roster, numLanes, circle=False):
+        live = cls(numLanes, circle)
+        live.times = dict(enumerate(roster.times))
+        live.entries = sorted((t, e) for e, t in live.times.items())
+        return live
+
+    def __len__(self):
+        return len(self.entries)
+
+    # late entry: adds a swimmer and returns the changed heats
+    def add(self, entry, time):
+        if entry in self.times:
+            raise KeyError(f"entry {entry} is already seeded")
+        before = self.layout()
+        self.times[entry] = time
+        key = (time, entry)
+        insort(self.entries, key)
+        return self.changedHeats(before, bisect_left(self.entries, key))
+
+    # scratch: removes a swimmer and returns the changed heats
+    def scratch(self, entry):
+        before = self.layout()
+        pos = self.position(entry)
+        del self.entries[pos]
+        del self.times[entry]
+        return self.changedHeats(before, pos)
+
+    # corrects a seed time and returns the changed heats
+    def correct(self, entry, time):
+        before = self.layout()
+        old = self.position(entry)
+        del self.entries[old]
+        self.times[entry] = time
+        key = (time, entry)
+        insort(self.entries, key)
+        new = bisect_left(self.entries, key)
+        return self.changedHeats(before, min(old, new))
+
+    # position of an entry in seed order, fastest first
+    def position(self, entry):
+        return bisect_left(self.entries, (self.times[entry], entry))
+
+    # returns (heat, lane) for an entry
+    def getSeat(self, entry):
+        return self.seat(self.position(entry), self.layout())
+
+    # returns the (entry, lane) pairs swimming in one heat
+    def getHeat(self, heat):
+        layout = self.layout()
+        count, numHeats, lastLanes, circle = layout
+        numLanes = self.numLanes
+        # a heat is one block of positions, the last partial heat
+        # or (when circle seeded) a stride of the top positions
+        k = int(numHeats) - heat
+        candidates = set(range(max(k * numLanes, 0),
+                               min((k + 1) * numLanes, count)))
+        candidates.update(range(max(lastLanes - 1, 0), count))
+        candidates.update(range(0, min(numLanes * circle, count)))
+        swimmers = []
+        for pos in sorted(candidates):
+            h, lane = self.seat(pos, layout)
+            if h == heat:
+                swimmers.append((self.entries[pos][1], lane))
+        return swimmers
+
+    # writes the heats and lanes of the given heats into a roster
+    def writeHeats(self, roster, heats):
+        for heat in heats:
+            for entry, lane in self.getHeat(heat):
+                roster.heats[entry] = heat
+                roster.lanes[entry] = lane
+
+    # count, numHeats, lastLanes and circle size for the present entries
+    def layout(self):
+        count = len(self.entries)
+        lastHeat = count % self.numLanes
+        if lastHeat < 3:
+            lastHeat = 3    # last heat must have 3 or more
+        lastLanes = count - lastHeat
+        numHeats = count / self.numLanes
+        if lastLanes > 0:
+            numHeats += 1
+        circle = 0
+        if self.circle and numHeats >= 2:
+            circle = 3 if numHeats >= 3 else 2
+        return count, numHeats, lastLanes, circle
+
+    # heat and lane of one position, the same as SeedEngine gives
+    def seat(self, pos, layout):
+        count, numHeats, lastLanes, circle = layout
+        heat, lane = self.straightSeat(pos, layout)
+        if pos < self.numLanes * circle:
+            heat = int(numHeats - pos % circle)
+        return heat, lane
+
+    # heat and lane of one position before circle seeding
+    def straightSeat(self, pos, layout):
+        count, numHeats, lastLanes, circle = layout
+        if pos >= lastLanes - 1:
+            # the slowest swimmers make up the last partial heat
+            heat = int(numHeats - max(lastLanes, 0) // self.numLanes - 1)
+            lane = self.laneOrder[pos - lastLanes + 1]
+        else:
+            heat = int(numHeats - pos // self.numLanes)
+            lane = self.laneOrder[pos % self.numLanes]
+        return heat, lane
+
+    # heats whose swimmers may differ after a change at position pos
+    def changedHeats(self, before, pos):
+        after = self.layout()
+        # positions ahead of the change keep their place unless the
+        # number of heats, the last heat or the circle size moved
+        start = min(pos, before[2] - 1, after[2] - 1)
+        if (int(before[1]) != int(after[1])) or (before[3] != after[3]):
+            start = 0
+        start = max(start, 0)
+        return self.heatsFrom(start, before) | self.heatsFrom(start, after)
+
+    # all the heats holding positions from start to the end
+    def heatsFrom(self, start, layout):
+        count, numHeats, lastLanes, circle = layout
+        if start >= count:
+            return set()
+        # straight seeded heats run downwards from start to the last heat
+        first = self.straightSeat(start, layout)[0]
+        last = self.straightSeat(count - 1, layout)[0]
+        heats = set(range(min(first, last), max(first, last) + 1))
+        if start < self.numLanes * circle:
+            heats.update(int(numHeats - k) for k in range(circle))
+        return heats
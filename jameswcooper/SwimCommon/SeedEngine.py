@@ -0,0 +1,121 @@
+"""Batch seeding engine for swim events.
+The engine seeds a whole event (or a whole meet) in one call.
+Seed times are ordered with a single stable key sort and the
+heat and lane for every position in that order are computed
+arithmetically from the lane order, rather than by walking
+the swimmers one at a time.
+Results come back as heat and lane arrays, one entry per swimmer
+in the order the times were given, so nothing is mutated."""
+
+from array import array
+
+
+# heat and lane arrays produced by seeding one event
+class Seeds():
+    __slots__ = ("heats", "lanes", "order", "numHeats")
+
+    def __init__(self, heats, lanes, order, numHeats):
+        self.heats = heats          # heat for each swimmer
+        self.lanes = lanes          # lane for each swimmer
+        self.order = order          # swimmer indexes, fastest first
+        self.numHeats = numHeats
+
+    def __len__(self):
+        return len(self.heats)
+
+
+class SeedEngine():
+
+    # This works for any number of lanes, odd or even
+    # seeding always starts in the middle and works outward
+    def laneOrder(self, numLanes):
+        lanes = array("i")
+        mid = numLanes / 2
+        if numLanes % 2 != 0:
+            mid = mid + 1   # start in middle lane
+        incr = 1
+        ln = mid
+        for i in range(0, numLanes):
+            lanes.append(int(ln))
+            ln = mid + incr
+            incr = - incr
+            if incr > 0:
+                incr = incr + 1
+        return lanes
+
+    # stable sort of swimmer indexes by seed time
+    def sortOrder(self, times):
+        return sorted(range(len(times)), key=times.__getitem__)
+
+    # Straight seeding puts the top swimmers in the last heat
+    # and the next fastest ones in the second heat and so forth
+    # order, if given, is the indexes already sorted by time,
+    # such as the permutation a Roster keeps for its times
+    def straight(self, times, numLanes, order=None):
+        count = len(times)
+        laneOrder = self.laneOrder(numLanes)
+        if order is None:
+            order = self.sortOrder(times)
+        if count < 3:
+            return self.oneHeat(order, laneOrder, count)
+
+        lastHeat = count % numLanes
+        if lastHeat < 3:
+            lastHeat = 3    # last heat must have 3 or more
+        lastLanes = count - lastHeat
+        numHeats = count / numLanes
+        if lastLanes > 0:
+            numHeats += 1   # compute total number of heats
+
+        heats = array("i", bytes(4 * count))
+        lanes = array("i", bytes(4 * count))
+        # full heats, fastest first, so we start with
+        # the last heat and work downwards
+        for pos in range(0, max(lastLanes, 0)):
+            row = order[pos]
+            heats[row] = int(numHeats - pos // numLanes)
+            lanes[row] = laneOrder[pos % numLanes]
+
+        # the slowest swimmers make up the last partial heat
+        heat = int(numHeats - max(lastLanes, 0) // numLanes - 1)
+        for j, pos in enumerate(range(lastLanes - 1, count)):
+            row = order[pos]
+            heats[row] = heat
+            lanes[row] = laneOrder[j]
+        return Seeds(heats, lanes, order, numHeats)
+
+    # too few swimmers for a last heat of 3, so they all
+    # swim in heat 1 in the middle lanes, fastest first
+    def oneHeat(self, order, laneOrder, count):
+        heats = array("i", [1]) * count
+        lanes = array("i", bytes(4 * count))
+        for pos in range(count):
+            lanes[order[pos]] = laneOrder[pos]
+        return Seeds(heats, lanes, order, 1 if count else 0)
+
+    # Circle seeding distributes the fastest swimmers
+    # into the top 3 heats, keeping their straight seeded lanes
+    def circle(self, times, numLanes, order=None):
+        seeds = self.straight(times, numLanes, order)
+        numHeats = seeds.numHeats
+        if numHeats < 2:
+            return seeds    # nothing to circle
+        circle = 3 if numHeats >= 3 else 2
+
+        heats = seeds.heats
+        order = seeds.order
+        for pos in range(0, min(numLanes * circle, len(order))):
+            heats[order[pos]] = int(numHeats - pos % circle)
+        return seeds
+
+    # seeds a whole meet in one call
+    # events is a sequence of (times, numLanes, circle) entries
+    # and the Seeds are returned in the same order
+    def seedMeet(self, events):
+        results = []
+        for times, numLanes, circle in events:
+            if circle:
+                results.append(self.circle(times, numLanes))
+            else:
+                results.append(self.straight(times, numLanes))
+        return results
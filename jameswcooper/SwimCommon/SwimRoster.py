@@ -0,0 +1,468 @@
+"""Columnar swimmer roster shared by the swim examples.
+Instead of one Swimmer object per line of the entry file, the
+Roster keeps one column per field: names in lists, ages, club codes,
+seed times, heats and lanes in compact arrays. Club symbols are
+interned once and stored as small integer codes, and seed times
+are kept as integer centiseconds so they sort without any
+string conversion.
+Swimmer is a lightweight view of one row, so existing code can
+still call getName() and read sw.club, sw.time and so forth."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+import heapq
+import operator
+import re
+import sys
+
+from FileCache import fileCache
+
+# the comparisons allowed in where clauses
+COMPARISONS = {"=": operator.eq, "==": operator.eq, "!=": operator.ne,
+               "<": operator.lt, "<=": operator.le,
+               ">": operator.gt, ">=": operator.ge}
+
+
+# converts a seed time such as 54.13 or 4:59.54 to centiseconds
+def toCentis(seedtime):
+    mins, _, secs = seedtime.rpartition(":")
+    whole, _, frac = secs.partition(".")
+    centis = int(whole) * 100 + int((frac + "00")[:2])
+    if mins:
+        centis += int(mins) * 6000
+    return centis
+
+
+# converts centiseconds back to the printed seed time form
+def fromCentis(centis):
+    mins, centis = divmod(centis, 6000)
+    secs, hund = divmod(centis, 100)
+    if mins > 0:
+        return f"{mins}:{secs:02}.{hund:02}"
+    return f"{secs}.{hund:02}"
+
+
+# the bit positions set in each byte value
+BYTEBITS = [tuple(bit for bit in range(8) if byte >> bit & 1)
+            for byte in range(256)]
+NONZERO = re.compile(b"[^\x00]")
+
+
+# bitmap with bit r set for every row r in rows
+def rowsToBits(rows, count):
+    data = bytearray((count + 7) // 8)
+    for row in rows:
+        data[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(data, "little")
+
+
+# row numbers, in order, of the bits set in a bitmap
+# zero bytes are skipped by the regular expression scan,
+# so the work follows the number of rows set
+def bitsToRows(bits):
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    rows = array("i")
+    for m in NONZERO.finditer(data):
+        base = m.start() * 8
+        rows.extend(base + bit for bit in BYTEBITS[data[m.start()]])
+    return rows
+
+
+# Struct of arrays holding every swimmer in an entry file
+class Roster():
+    def __init__(self):
+        self.frnames = []           # first names
+        self.lnames = []            # last names
+        self.ages = array("H")      # ages
+        self.clubIds = array("I")   # index into self.clubs
+        self.times = array("i")     # seed times in centiseconds
+        self.heats = array("i")     # seeded heats and lanes go here
+        self.lanes = array("i")
+        self.clubs = []             # interned club symbols
+        self.clubIndex = {}         # club symbol -> club id
+        self.sortIndexes = {}       # cached sort permutations
+        self.widths = {}            # cached printed column widths
+        self.hashIndexes = {}       # field -> {value: row numbers}
+        self.rangeIndexes = {}      # field -> (sorted values, rows)
+        self.bitmaps = {}           # field -> {value: row bitmap}
+
+    # reads a whole entry file into a new roster
+    @classmethod
+    def read(cls, filename):
+        roster = cls()
+        with open(filename, "r") as f:
+            roster.addLines(f)
+        return roster
+
+    # parses lines like "1 Kelly Harrigan 14 NES 54.13"
+    # the first (numbered) column is skipped
+    # the column appends are bound once, and the cached indexes
+    # are dropped once for the whole batch rather than per row
+    def addLines(self, lines):
+        addFrname = self.frnames.append
+        addLname = self.lnames.append
+        addAge = self.ages.append
+        addClubId = self.clubIds.append
+        addTime = self.times.append
+        clubIndex = self.clubIndex
+        clubId = self.clubId
+        intern = sys.intern
+        start = len(self)
+        for dataline in lines:
+            sarray = dataline.split()
+            if len(sarray) < 6:
+                continue            # skip blank lines
+            addFrname(intern(sarray[1]))
+            addLname(sarray[2])
+            addAge(int(sarray[3]))
+            cid = clubIndex.get(sarray[4])
+            addClubId(clubId(sarray[4]) if cid is None else cid)
+            addTime(toCentis(sarray[5]))
+        added = len(self) - start
+        if added:
+            # seeded heats and lanes start at zero
+            zeros = array("i", [0]) * added
+            self.heats.extend(zeros)
+            self.lanes.extend(zeros)
+            self.changed()
+
+    # appends one swimmer to every column
+    def addSwimmer(self, frname, lname, age, club, centis):
+        self.frnames.append(sys.intern(frname))
+        self.lnames.append(lname)
+        self.ages.append(age)
+        self.clubIds.append(self.clubId(club))
+        self.times.append(centis)
+        self.heats.append(0)
+        self.lanes.append(0)
+        self.changed()
+
+    # appends all the rows of another roster, column by column
+    # the other roster's club codes are mapped to this one's
+    def extend(self, other):
+        remap = [self.clubId(club) for club in other.clubs]
+        self.frnames.extend(other.frnames)
+        self.lnames.extend(other.lnames)
+        self.ages.extend(other.ages)
+        if remap == list(range(len(remap))):
+            self.clubIds.extend(other.clubIds)  # same codes, no mapping
+        else:
+            self.clubIds.extend(map(remap.__getitem__, other.clubIds))
+        self.times.extend(other.times)
+        self.heats.extend(other.heats)
+        self.lanes.extend(other.lanes)
+        self.changed()
+
+    # cached orders and indexes are stale once the rows change
+    def changed(self):
+        self.sortIndexes.clear()
+        self.widths.clear()
+        self.hashIndexes.clear()
+        self.rangeIndexes.clear()
+        self.bitmaps.clear()
+
+    # returns the code for a club, adding it if it is new
+    def clubId(self, club):
+        cid = self.clubIndex.get(club)
+        if cid is None:
+            cid = len(self.clubs)
+            self.clubs.append(sys.intern(club))
+            self.clubIndex[club] = cid
+        return cid
+
+    def __len__(self):
+        return len(self.times)
+
+    # returns a view of one row
+    def row(self, index):
+        return Swimmer(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Swimmer(self, index)
+
+    # returns a List of Swimmer views in file order
+    def getSwimmers(self):
+        return [Swimmer(self, index) for index in range(len(self))]
+
+    # gets an array of club names sorted alphabetically
+    def getClubs(self):
+        return sorted(self.clubs)
+
+    # returns the column of values that where clauses compare
+    def valueColumn(self, name):
+        if name == "club":
+            return [self.clubs[cid] for cid in self.clubIds]
+        if name in ("time", "centis", "seedtime"):
+            return self.times
+        return self.sortColumn(name)
+
+    # converts the text of a where clause to a column value
+    def parseValue(self, name, text):
+        if name == "age":
+            return int(text)
+        if name in ("time", "centis", "seedtime"):
+            return toCentis(text)
+        return text
+
+    # hash index of a field: value -> row numbers in file order
+    def hashIndex(self, name):
+        index = self.hashIndexes.get(name)
+        if index is None:
+            index = {}
+            for row, value in enumerate(self.valueColumn(name)):
+                rows = index.get(value)
+                if rows is None:
+                    rows = index[value] = array("i")
+                rows.append(row)
+            self.hashIndexes[name] = index
+        return index
+
+    # bitmap of the rows where a field has a value,
+    # built from the hash index and kept for compound filters
+    def bitmap(self, name, value):
+        bitmaps = self.bitmaps.get(name)
+        if bitmaps is None:
+            bitmaps = {v: rowsToBits(rows, len(self))
+                       for v, rows in self.hashIndex(name).items()}
+            self.bitmaps[name] = bitmaps
+        return bitmaps.get(value, 0)
+
+    # bitmap of the rows with ages from minAge to maxAge
+    def ageBitmap(self, minAge=None, maxAge=None):
+        bits = 0
+        for age in self.hashIndex("age"):
+            if (minAge is None or age >= minAge) and \
+                    (maxAge is None or age <= maxAge):
+                bits |= self.bitmap("age", age)
+        return bits
+
+    # row numbers, in file order, of the members of a club
+    # within an age range; one club is read straight from its
+    # inverted index, compound filters intersect bitmaps
+    def clubRows(self, club=None, minAge=None, maxAge=None):
+        if minAge is None and maxAge is None:
+            if club is None:
+                return range(len(self))
+            return self.hashIndex("club").get(club, ())
+        bits = self.ageBitmap(minAge, maxAge)
+        if club is not None:
+            bits &= self.bitmap("club", club)
+        return bitsToRows(bits)
+
+    # sorted index of a field: the sorted values and their rows
+    def rangeIndex(self, name):
+        index = self.rangeIndexes.get(name)
+        if index is None:
+            rows = self.sortIndex((name,))
+            column = self.valueColumn(name)
+            index = ([column[row] for row in rows], rows)
+            self.rangeIndexes[name] = index
+        return index
+
+    # row numbers where "name op value" is true
+    # equality comes from the hash index, ranges from the sorted index
+    def select(self, name, op, value):
+        if op in ("=", "=="):
+            return self.hashIndex(name).get(value, ())
+        if op == "!=":
+            skip = self.hashIndex(name).get(value, ())
+            return set(range(len(self))).difference(skip)
+        values, rows = self.rangeIndex(name)
+        if op == "<":
+            return rows[:bisect_left(values, value)]
+        if op == "<=":
+            return rows[:bisect_right(values, value)]
+        if op == ">":
+            return rows[bisect_right(values, value):]
+        if op == ">=":
+            return rows[bisect_left(values, value):]
+        raise ValueError(f"unknown comparison {op}")
+
+    # row numbers, in file order, matching all the
+    # (name, op, value) predicates
+    def where(self, predicates):
+        predicates = [(name, op, self.parseValue(name, text))
+                      for name, op, text in predicates]
+        if not predicates:
+            return list(range(len(self)))
+        # start from the smallest index result and check the
+        # other predicates only on those rows
+        matches = [self.select(*p) for p in predicates]
+        first = min(range(len(matches)), key=lambda i: len(matches[i]))
+        tests = [self.rowTest(*p) for i, p in enumerate(predicates)
+                 if i != first]
+        rows = sorted(matches[first])
+        for test in tests:
+            rows = [row for row in rows if test(row)]
+        return rows
+
+    # function telling whether one row satisfies "name op value"
+    def rowTest(self, name, op, value):
+        compare = COMPARISONS[op]
+        if name == "club":
+            clubs, clubIds = self.clubs, self.clubIds
+            return lambda row: compare(clubs[clubIds[row]], value)
+        column = self.valueColumn(name)
+        return lambda row: compare(column[row], value)
+
+    # widest printed value of a field, so rows can be
+    # formatted in columns without a pass over the rows
+    def fieldWidth(self, name):
+        width = self.widths.get(name)
+        if width is None:
+            if name == "frname":
+                width = max(map(len, self.frnames), default=0)
+            elif name == "lname":
+                width = max(map(len, self.lnames), default=0)
+            elif name == "club":
+                width = max(map(len, self.clubs), default=0)
+            elif name == "age":
+                width = len(str(max(self.ages, default=0)))
+            elif name == "time":
+                width = max((len(str(t / 100)) for t in set(self.times)),
+                            default=0)
+            elif name == "seedtime":
+                width = len(fromCentis(max(self.times, default=0)))
+            else:
+                width = 0
+            self.widths[name] = width
+        return width
+
+    # returns a column that sorts the same way as the named field
+    # clubs are replaced by their alphabetical rank
+    def sortColumn(self, name):
+        if name == "frname":
+            return self.frnames
+        if name == "lname":
+            return self.lnames
+        if name == "age":
+            return self.ages
+        if name in ("time", "centis", "seedtime"):
+            return self.times
+        if name == "club":
+            rank = [0] * len(self.clubs)
+            for r, cid in enumerate(sorted(range(len(self.clubs)),
+                                           key=self.clubs.__getitem__)):
+                rank[cid] = r
+            return [rank[cid] for cid in self.clubIds]
+        raise KeyError(f"cannot sort by {name}")
+
+    # row numbers in stable order of one or more fields
+    # the permutation is cached until the roster changes
+    def sortIndex(self, names):
+        names = tuple(names)
+        index = self.sortIndexes.get(names)
+        if index is None:
+            index = array("i", sorted(range(len(self)),
+                                      key=self.sortKey(names)))
+            self.sortIndexes[names] = index
+        return index
+
+    # the first count rows of sortIndex(names), found by partial
+    # heap selection in O(n log count) unless the order is cached
+    def topIndex(self, names, count):
+        names = tuple(names)
+        index = self.sortIndexes.get(names)
+        if index is not None:
+            return index[:count]
+        return heapq.nsmallest(count, range(len(self)),
+                               key=self.sortKey(names))
+
+    # key function giving the sort value of a row number
+    def sortKey(self, names):
+        columns = [self.sortColumn(name) for name in names]
+        if len(columns) == 1:
+            return columns[0].__getitem__
+        return list(zip(*columns)).__getitem__
+
+
+# the shared, read only roster of an entry file, parsed again
+# only when the file changes, and only its new lines when it grows
+# callers that write heats and lanes should use Roster.read
+def loadRoster(filename):
+    return fileCache.load(filename, Roster)
+
+
+# A Swimmer is just a roster and a row number
+# All the fields are read from (and heat and lane
+# written to) the roster columns
+class Swimmer():
+    __slots__ = ("roster", "index")
+
+    def __init__(self, roster, index):
+        self.roster = roster
+        self.index = index
+
+    @property
+    def frname(self):
+        return self.roster.frnames[self.index]
+
+    @property
+    def lname(self):
+        return self.roster.lnames[self.index]
+
+    @property
+    def age(self):
+        return self.roster.ages[self.index]
+
+    @property
+    def club(self):
+        return self.roster.clubs[self.roster.clubIds[self.index]]
+
+    # seed time in centiseconds
+    @property
+    def centis(self):
+        return self.roster.times[self.index]
+
+    # seed time in seconds, used for sorting
+    @property
+    def time(self):
+        return self.roster.times[self.index] / 100
+
+    # seed time as string
+    @property
+    def seedtime(self):
+        return fromCentis(self.roster.times[self.index])
+
+    @property
+    def heat(self):
+        return self.roster.heats[self.index]
+
+    @heat.setter
+    def heat(self, heat):
+        self.roster.heats[self.index] = heat
+
+    @property
+    def lane(self):
+        return self.roster.lanes[self.index]
+
+    @lane.setter
+    def lane(self, lane):
+        self.roster.lanes[self.index] = lane
+
+    # Concatenate first and last names
+    def getName(self):
+        return self.frname + " " + self.lname
+
+    def __repr__(self):
+        return f"Swimmer({self.getName()!r}, {self.club}, {self.seedtime})"
+
+
+# Array of swimmers read from one entry file
+class Swimmers():
+    def __init__(self, filename):
+        self.roster = loadRoster(filename)
+        self.swimmers = self.roster.getSwimmers()
+
+    # returns the underlying columns
+    def getRoster(self):
+        return self.roster
+
+    # gets an array of clubs and sorts it
+    def getClubs(self):
+        return self.roster.getClubs()
+
+    # returns an array of Swimmers
+    def getSwimmers(self):
+        return self.swimmers